@@ -0,0 +1,121 @@
+# In-process product catalog cache with a monotonically increasing catalog version
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCache:
+    """All product documents keyed by id, plus a version bumped on every catalog write.
+
+    Writes through the API call ``products_changed`` (single products, refreshed in
+    place) or ``invalidate`` (bulk changes, reloaded lazily). After ``ttl`` seconds
+    the cache is reloaded in the background, bounding staleness from writes made by
+    other processes. Derived indexes subscribe through ``on_load`` (async, called
+    with every product before a load is published) and ``on_change``
+    (``(product_id, product or None)`` after single-product writes).
+    """
+
+    def __init__(self, collection_getter, ttl: float = 300.0, max_derived: int = 256):
+        self._collection = collection_getter
+        self.ttl = ttl
+        self.version = 0
+        self._generation = 0  # bumped by invalidate()
+        self._products: Optional[Dict[str, dict]] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._warming: Optional[asyncio.Task] = None
+        self.on_load: List[Callable[[Dict[str, dict]], Awaitable[None]]] = []
+        self.on_change: List[Callable[[str, Optional[dict]], None]] = []
+        self._derived: Dict[Hashable, Any] = {}
+        self._derived_version = 0
+        self.max_derived = max_derived
+
+    @property
+    def is_warm(self) -> bool:
+        return self._products is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def load(self) -> Dict[str, dict]:
+        """(Re)load every product; concurrent callers share a single load"""
+        async with self._lock:
+            if self.is_warm:
+                return self._products
+            version, generation = self.version, self._generation
+            products = {}
+            async for doc in self._collection().find({}, {"_id": 0}):
+                products[doc["id"]] = doc
+            for callback in self.on_load:
+                await callback(products)
+            if generation == self._generation:
+                # A write during the load may be missing; publish but reload again soon
+                self._products = products
+                self._loaded_at = time.monotonic() if version == self.version else 0.0
+                self._derived.clear()  # picks up writes made by other processes
+            logger.info(f"Catalog cache loaded {len(products)} products")
+            return products
+
+    async def products(self) -> Dict[str, dict]:
+        """Every product; an expired cache is served while it reloads in the background"""
+        if self._products is not None:
+            self.warm()
+            return self._products
+        return await self.load()
+
+    def warm(self):
+        """Start a background load unless warm or already loading"""
+        if not self.is_warm and (self._warming is None or self._warming.done()):
+            self._warming = asyncio.create_task(self.load())
+
+    async def get_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        """Products for ``ids`` from memory when warm, otherwise with one $in query"""
+        ids = list(ids)
+        self.warm()
+        if self._products is not None:
+            return {i: self._products[i] for i in ids if i in self._products}
+        found = {}
+        async for doc in self._collection().find({"id": {"$in": ids}}, {"_id": 0}):
+            found[doc["id"]] = doc
+        return found
+
+    async def products_changed(self, ids: List[str]):
+        """Refresh specific products after a write (deleted ids are dropped)"""
+        self.version += 1
+        if self._products is None:
+            return
+        fresh = {}
+        async for doc in self._collection().find({"id": {"$in": list(ids)}}, {"_id": 0}):
+            fresh[doc["id"]] = doc
+        for product_id in ids:
+            if product_id in fresh:
+                self._products[product_id] = fresh[product_id]
+            else:
+                self._products.pop(product_id, None)
+            for callback in self.on_change:
+                callback(product_id, fresh.get(product_id))
+
+    def invalidate(self):
+        """Drop everything after a bulk change; the next reader reloads"""
+        self.version += 1
+        self._generation += 1
+        self._products = None
+
+    def touch(self):
+        """Bump the catalog version for changes outside the products collection (e.g. categories)"""
+        self.version += 1
+
+    async def derived(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Memoize ``compute()`` (e.g. an aggregation) until the catalog version moves"""
+        if self._derived_version != self.version:
+            self._derived.clear()
+            self._derived_version = self.version
+        if key in self._derived:
+            return self._derived[key]
+        version = self.version
+        value = await compute()
+        if version == self.version:
+            if len(self._derived) >= self.max_derived:
+                self._derived.pop(next(iter(self._derived)))
+            self._derived[key] = value
+        return value
@@ -0,0 +1,221 @@
+# Synthetic large-catalog generator for DryFruto, built on the seed_data templates
+#
+# Usage (reads MONGO_URL / DB_NAME from the environment or backend/.env):
+#   python catalog_generator.py --products 100000 --bulk-orders 20000 --newsletter 50000 --drop
+import argparse
+import asyncio
+import copy
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+import seed_data
+from revisions import RevisionLog
+from seed_data import stable_id
+
+QUALIFIERS = ["Premium", "Organic", "Roasted", "Salted", "Classic", "Jumbo", "Select", "Royal", "Farm Fresh", "Handpicked"]
+ORIGINS = ["Kashmiri", "Californian", "Afghan", "Iranian", "Turkish", "Kerala", "Goan", "Omani", "Rajasthani", "Himalayan"]
+# Pack sizes with their weight multiplier relative to 100g and the bulk discount applied
+VARIANTS = [("100g", 1, 1.0), ("250g", 2.5, 0.96), ("500g", 5, 0.92), ("1kg", 10, 0.88)]
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Meera", "Kabir", "Isha"]
+LAST_NAMES = ["Sharma", "Patel", "Kumar", "Singh", "Verma", "Gupta", "Reddy", "Nair", "Iyer", "Khan"]
+COMPANIES = ["Fresh Mart", "Healthy Bites", "Spice Route", "Royal Caterers", "Green Basket", ""]
+ORDER_STATUSES = ["new", "new", "new", "contacted", "completed"]
+# Collections served to the storefront: their documents carry a revision / version like API writes
+CONTENT_COLLECTIONS = {"categories", "products", "hero_slides", "testimonials", "gift_boxes"}
+
+
+def generate_categories(count: int = 0) -> list:
+    """The seed categories plus synthetic ones until ``count`` categories exist"""
+    categories = [dict(c) for c in seed_data.categories]
+    for i in range(len(categories), count):
+        template = seed_data.categories[i % len(seed_data.categories)]
+        origin = ORIGINS[i % len(ORIGINS)]
+        slug = f"{origin.lower()}-{template['slug']}-{i}"
+        categories.append({
+            **template,
+            "id": stable_id("categories", slug),
+            "name": f"{origin} {template['name']}",
+            "slug": slug,
+        })
+    return categories
+
+
+def price_variants(base_price: float) -> dict:
+    return {name: round(base_price * weight * discount) for name, weight, discount in VARIANTS}
+
+
+def generate_products(count: int, categories=None, seed: int = 42):
+    """Yield ``count`` product documents expanded from the seed products"""
+    rng = random.Random(seed)
+    category_slugs = [c["slug"] for c in categories] if categories else None
+    templates = seed_data.products
+    for i in range(count):
+        template = templates[i % len(templates)]
+        product = copy.deepcopy(template)
+        qualifier, origin = rng.choice(QUALIFIERS), rng.choice(ORIGINS)
+        product["name"] = f"{qualifier} {origin} {template['name']}"
+        product["slug"] = f"{template['slug']}-{i}"
+        product["id"] = stable_id("products", product["slug"])
+        product["sku"] = f"DRF{i:06d}"
+        product["basePrice"] = float(round(template["basePrice"] * rng.uniform(0.7, 1.6)))
+        product["priceVariants"] = price_variants(product["basePrice"])
+        if category_slugs and rng.random() < 0.3:
+            product["category"] = rng.choice(category_slugs)
+        product["shortDescription"] = f"{qualifier} {origin.lower()} {template['type'].lower()}. {template['shortDescription']}"
+        yield product
+
+
+def _created_at(rng: random.Random, now: datetime) -> str:
+    return (now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))).isoformat()
+
+
+def generate_bulk_orders(count: int, seed: int = 42):
+    """Yield bulk order submissions spread over the last year"""
+    rng = random.Random(seed + 1)
+    now = datetime.now(timezone.utc)
+    product_types = seed_data.site_settings.get("bulkOrderProductTypes") or \
+        ["Dry Fruits", "Nuts", "Seeds", "Berries", "Gift Boxes", "Mixed Products"]
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": stable_id("bulk_order", str(i)),
+            "name": f"{first} {last}",
+            "company": rng.choice(COMPANIES),
+            "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+            "phone": f"9{rng.randint(100000000, 999999999)}",
+            "productType": rng.choice(product_types),
+            "quantity": f"{rng.choice([10, 25, 50, 100, 250, 500])} kg",
+            "message": "Please share your best rates for a regular monthly supply.",
+            "createdAt": _created_at(rng, now),
+            "status": rng.choice(ORDER_STATUSES),
+        }
+
+
+def generate_newsletter(count: int, seed: int = 42):
+    """Yield unique newsletter subscriptions spread over the last year"""
+    rng = random.Random(seed + 2)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        yield {
+            "id": stable_id("newsletter", str(i)),
+            "email": f"subscriber{i}@example.com",
+            "createdAt": _created_at(rng, now),
+        }
+
+
+def _batches(docs, size: int):
+    docs = iter(docs)
+    while batch := list(islice(docs, size)):
+        yield batch
+
+
+async def bulk_insert(collection, docs, batch_size: int = 1000, concurrency: int = 8, key: Optional[str] = None) -> int:
+    """Insert ``docs`` with unordered batches, ``concurrency`` batches in flight.
+
+    Without ``key`` batches go through insert_many; with it they are upserts
+    that only insert documents whose ``key`` is not stored yet, so loading
+    again adds nothing twice.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    inserted = 0
+
+    async def insert(batch):
+        nonlocal inserted
+        try:
+            if key is None:
+                result = await collection.insert_many(batch, ordered=False)
+                inserted += len(result.inserted_ids)
+            else:
+                operations = [UpdateOne({key: doc[key]}, {"$setOnInsert": doc}, upsert=True) for doc in batch]
+                result = await collection.bulk_write(operations, ordered=False)
+                inserted += result.upserted_count
+        finally:
+            semaphore.release()
+
+    tasks = []
+    for batch in _batches(docs, batch_size):
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(insert(batch)))
+    await asyncio.gather(*tasks)
+    return inserted
+
+
+async def drop_generated(collection, revisions: RevisionLog, revision: int):
+    """Empty a generated collection; synced content leaves tombstones so /api/sync clients drop it too"""
+    ids = []
+    if collection.name in CONTENT_COLLECTIONS:
+        ids = [doc["id"] async for doc in collection.find({}, {"_id": 0, "id": 1}) if "id" in doc]
+    await collection.delete_many({})
+    await revisions.tombstone(collection.name, ids, revision)
+
+
+async def load_catalog(db, products: int, categories: int = 0, bulk_orders: int = 0, newsletter: int = 0,
+                       seed: int = 42, batch_size: int = 1000, concurrency: int = 8, drop: bool = False) -> dict:
+    """Generate and load a synthetic dataset; returns inserted counts per collection.
+
+    Documents are keyed by stable ids, so without ``drop`` only missing ones are inserted.
+    Deletions and inserts share one content revision, like an API write.
+    """
+    category_docs = generate_categories(categories)
+    generated = ("categories", "products", "bulk_orders", "newsletter")
+    revisions = RevisionLog(lambda: db)
+    async with revisions.allocate() as revision:
+        if drop:
+            await asyncio.gather(*(drop_generated(db[name], revisions, revision) for name in generated))
+        else:
+            await asyncio.gather(*(db[name].create_index("id") for name in generated))
+        existing_slugs = set(await db.categories.distinct("slug"))
+        plan = {
+            "categories": [c for c in category_docs if c["slug"] not in existing_slugs],
+            "products": generate_products(products, category_docs, seed),
+            "bulk_orders": generate_bulk_orders(bulk_orders, seed),
+            "newsletter": generate_newsletter(newsletter, seed),
+        }
+        # Site content the storefront expects alongside the catalog
+        for name, docs in (("hero_slides", seed_data.hero_slides), ("testimonials", seed_data.testimonials),
+                           ("gift_boxes", seed_data.gift_boxes)):
+            if await db[name].estimated_document_count() == 0:
+                plan[name] = [dict(d) for d in docs]
+        key = None if drop else "id"
+        for name in CONTENT_COLLECTIONS & set(plan):
+            plan[name] = ({**doc, "version": 0, "revision": revision} for doc in plan[name])
+        counts = await asyncio.gather(*(bulk_insert(db[name], docs, batch_size, concurrency, key)
+                                        for name, docs in plan.items()))
+    return dict(zip(plan, counts))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic DryFruto dataset")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--categories", type=int, default=0, help="Total categories (default: the seed categories)")
+    parser.add_argument("--bulk-orders", type=int, default=0)
+    parser.add_argument("--newsletter", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; same seed gives the same documents")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8, help="insert_many batches in flight")
+    parser.add_argument("--drop", action="store_true",
+                        help="Empty the generated collections first (plain inserts; otherwise missing documents are upserted)")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    start = time.perf_counter()
+    counts = await load_catalog(db, args.products, args.categories, args.bulk_orders, args.newsletter,
+                                args.seed, args.batch_size, args.concurrency, args.drop)
+    print(f"Inserted {counts} in {time.perf_counter() - start:.1f}s")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+# Server-Sent Events fan-out of content change notifications
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_OVERFLOW = None  # queued in place of everything else when a client falls behind
+
+
+def format_event(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class Broadcaster:
+    """Publishes each event once, encoded, to a bounded queue per connected client.
+
+    ``publish`` never blocks: a client whose queue is full is dropped and gets a
+    final ``overflow`` event instead of the backlog, after which it should catch
+    up with ``/api/sync`` and reconnect. Idle streams get a comment every
+    ``heartbeat`` seconds so proxies keep them open and dead peers are noticed.
+    """
+
+    def __init__(self, queue_size: int = 100, heartbeat: float = 15.0, retry_ms: int = 3000):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+        self._clients: Set[asyncio.Queue] = set()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._clients)
+
+    def publish(self, event: str, data: dict, event_id: Optional[str] = None):
+        if not self._clients:
+            return
+        message = format_event(event, data, event_id)
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+        self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_OVERFLOW)
+        logger.info("Dropped a slow event stream client")
+
+    async def stream(self) -> AsyncIterator[str]:
+        """SSE text for one client until it disconnects or falls behind"""
+        queue = asyncio.Queue(self.queue_size)
+        self._clients.add(queue)
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is _OVERFLOW:
+                    yield format_event("overflow", {"detail": "Client fell behind; resync and reconnect"})
+                    return
+                yield message
+        finally:
+            self._clients.discard(queue)
@@ -0,0 +1,129 @@
+# Event-loop lag monitor and blocking-call detector
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopMonitor:
+    """Measures how late the event loop wakes up and, optionally, what blocked it.
+
+    A sampler task sleeps for ``interval`` seconds and records the overshoot as
+    loop lag. With ``capture_stacks`` enabled a watchdog thread pings the loop and,
+    when a ping is not answered within ``block_threshold`` seconds, records the
+    stack of the loop thread so the blocking call can be found.
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.1,
+                 capture_stacks: bool = False, window: int = 600):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.capture_stacks = capture_stacks
+        self._lags = deque(maxlen=window)
+        self._blocked = deque(maxlen=50)
+        self._stall_count = 0
+        self._max_lag = 0.0
+        self._loop = None
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample())
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._watchdog = None
+
+    async def _sample(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            self._lags.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            if lag >= self.block_threshold:
+                self._stall_count += 1
+
+    def _watch(self):
+        while not self._stop.is_set():
+            answered = threading.Event()
+            started = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # loop closed
+            if not answered.wait(self.block_threshold):
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+                while not answered.wait(0.05):
+                    if self._stop.is_set():
+                        return
+                blocked = {
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "durationMs": round((time.perf_counter() - started) * 1000, 2),
+                    "stack": stack,
+                }
+                self._blocked.append(blocked)
+                logger.warning(json.dumps({"event": "event_loop_blocked", **blocked}))
+            self._stop.wait(self.block_threshold)
+
+    def snapshot(self) -> dict:
+        lags = sorted(self._lags)
+        return {
+            "intervalMs": self.interval * 1000,
+            "blockThresholdMs": self.block_threshold * 1000,
+            "samples": len(lags),
+            "currentLagMs": round(self._lags[-1] * 1000, 3) if self._lags else 0.0,
+            "p50LagMs": round(_percentile(lags, 50) * 1000, 3),
+            "p99LagMs": round(_percentile(lags, 99) * 1000, 3),
+            "maxLagMs": round(self._max_lag * 1000, 3),
+            "stalls": self._stall_count,
+            "captureStacks": self.capture_stacks,
+            "blockedCalls": list(self._blocked),
+        }
+
+    def prometheus(self) -> str:
+        """Render the lag metrics in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            "# HELP event_loop_lag_seconds Event loop wake-up delay over the sampling window",
+            "# TYPE event_loop_lag_seconds gauge",
+            f'event_loop_lag_seconds{{quantile="0.5"}} {snap["p50LagMs"] / 1000}',
+            f'event_loop_lag_seconds{{quantile="0.99"}} {snap["p99LagMs"] / 1000}',
+            "# HELP event_loop_lag_max_seconds Largest event loop wake-up delay since startup",
+            "# TYPE event_loop_lag_max_seconds gauge",
+            f'event_loop_lag_max_seconds {snap["maxLagMs"] / 1000}',
+            "# HELP event_loop_stalls_total Samples whose lag exceeded the block threshold",
+            "# TYPE event_loop_stalls_total counter",
+            f"event_loop_stalls_total {snap['stalls']}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,55 @@
+# RFC 7396 JSON merge patch, applied in memory or translated to MongoDB $set/$unset paths
+from typing import Any, Dict, Tuple
+
+
+class MergePatchError(ValueError):
+    pass
+
+
+def apply(target: Any, patch: Any) -> Any:
+    """The result of merging ``patch`` into ``target`` (neither is modified)"""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply(result.get(key), value)
+    return result
+
+
+def _check_key(key: str):
+    if not key or "." in key or key.startswith("$"):
+        raise MergePatchError(f"Invalid member name {key!r}")
+
+
+def update_operations(patch: dict, stored: dict, prefix: str = "") -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """($set, $unset) for merging ``patch`` into the stored (sub)document ``stored``.
+
+    Members that are objects on both sides are patched member by member through
+    dotted paths; anything else is replaced whole, so the update touches only
+    what the patch names.
+    """
+    to_set, to_unset = {}, {}
+    for key, value in patch.items():
+        _check_key(key)
+        path = f"{prefix}{key}"
+        if value is None:
+            if key in stored:
+                to_unset[path] = ""
+        elif isinstance(value, dict) and isinstance(stored.get(key), dict):
+            nested_set, nested_unset = update_operations(value, stored[key], f"{path}.")
+            to_set.update(nested_set)
+            to_unset.update(nested_unset)
+        else:
+            _check_keys(value)
+            to_set[path] = apply(None, value)
+    return to_set, to_unset
+
+
+def _check_keys(value: Any):
+    if isinstance(value, dict):
+        for key, nested in value.items():
+            _check_key(key)
+            _check_keys(nested)
@@ -0,0 +1,78 @@
+# Cart quote engine: prices (product, variant, quantity) lines from in-memory product documents
+import re
+from typing import Dict, List, Optional
+
+# Pack sizes offered by the storefront and their price multiplier over basePrice (the 100g price),
+# used when a product has no explicit priceVariants entry (mirrors ProductPage.jsx)
+SIZE_MULTIPLIERS = {"100g": 1, "250g": 2.4, "500g": 4.5, "1kg": 8.5, "2kg": 16, "5kg": 38}
+DEFAULT_VARIANT = "100g"
+
+_WEIGHT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(kg|g)\s*$", re.IGNORECASE)
+
+
+def variant_weight_kg(variant: str) -> Optional[float]:
+    """Pack weight in kg parsed from a variant key such as '250g' or '1kg'"""
+    match = _WEIGHT.match(variant)
+    if not match:
+        return None
+    amount = float(match.group(1))
+    return amount if match.group(2).lower() == "kg" else amount / 1000
+
+
+def unit_price(product: dict, variant: str) -> Optional[float]:
+    """Price of one pack; None when the product is not sold in that variant"""
+    price = (product.get("priceVariants") or {}).get(variant)
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return float(price)
+    if variant in SIZE_MULTIPLIERS and isinstance(product.get("basePrice"), (int, float)):
+        return float(round(product["basePrice"] * SIZE_MULTIPLIERS[variant]))
+    return None
+
+
+def select_tier(tiers: List[dict], weight_kg: float) -> Optional[dict]:
+    """Highest bulk tier whose minKg the order weight reaches"""
+    best = None
+    for tier in tiers:
+        if weight_kg >= tier.get("minKg", 0) and (best is None or tier.get("minKg", 0) > best.get("minKg", 0)):
+            best = tier
+    return best
+
+
+def quote(lines: List[dict], products: Dict[str, dict], tiers: List[dict]) -> dict:
+    """Line and order totals for ``lines`` ({productId, variant, quantity}).
+
+    Lines whose product or variant cannot be priced are returned with an
+    ``error`` and left out of the totals. The bulk tier is chosen from the
+    total weight of the priced lines and discounts the whole subtotal.
+    """
+    priced, subtotal, weight = [], 0.0, 0.0
+    for line in lines:
+        variant = line.get("variant") or DEFAULT_VARIANT
+        result = {"productId": line["productId"], "variant": variant, "quantity": line["quantity"]}
+        priced.append(result)
+        product = products.get(line["productId"])
+        if product is None:
+            result["error"] = "Product not found"
+            continue
+        price = unit_price(product, variant)
+        if price is None:
+            result["error"] = f"Variant '{variant}' not available"
+            continue
+        line_total = round(price * line["quantity"], 2)
+        line_weight = (variant_weight_kg(variant) or 0) * line["quantity"]
+        result.update(name=product.get("name"), unitPrice=price, lineTotal=line_total,
+                      weightKg=round(line_weight, 3))
+        subtotal += line_total
+        weight += line_weight
+
+    tier = select_tier(tiers, weight)
+    discount_percent = tier.get("discountPercent", 0) if tier else 0
+    discount = round(subtotal * discount_percent / 100, 2)
+    return {
+        "lines": priced,
+        "subtotal": round(subtotal, 2),
+        "totalWeightKg": round(weight, 3),
+        "tier": tier,
+        "discount": discount,
+        "total": round(subtotal - discount, 2),
+    }
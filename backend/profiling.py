@@ -0,0 +1,106 @@
+# On-demand CPU sampling and tracemalloc memory profiling for the running backend
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def sample_cpu(seconds: float, interval: float = 0.01) -> Counter:
+    """Sample every thread's stack for ``seconds`` and count collapsed stacks.
+
+    Blocking; run it in a worker thread. Keys are ``thread;outer;...;inner``
+    strings, ready for flamegraph.pl or speedscope.
+    """
+    own_id = threading.get_ident()
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _stat_to_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "sizeKb": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+
+
+def _diff_to_dict(stat) -> dict:
+    return {
+        **_stat_to_dict(stat),
+        "sizeDiffKb": round(stat.size_diff / 1024, 1),
+        "countDiff": stat.count_diff,
+    }
+
+
+class MemoryProfiler:
+    """Keeps a few named tracemalloc snapshots so they can be diffed later"""
+
+    def __init__(self, max_snapshots: int = 5, frames: int = 10):
+        self.max_snapshots = max_snapshots
+        self.frames = frames
+        self._snapshots = OrderedDict()
+
+    def take_snapshot(self, top: int = 20) -> dict:
+        """Start tracing if needed, store a snapshot and return its top allocations"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        snapshot_id = uuid.uuid4().hex[:8]
+        self._snapshots[snapshot_id] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "id": snapshot_id,
+            "takenAt": datetime.now(timezone.utc).isoformat(),
+            "tracedKb": round(current / 1024, 1),
+            "peakKb": round(peak / 1024, 1),
+            "top": [_stat_to_dict(s) for s in snapshot.statistics("lineno")[:top]],
+        }
+
+    def snapshot_ids(self) -> list:
+        return list(self._snapshots)
+
+    def diff(self, base_id: str, target_id: str, top: int = 20) -> dict:
+        """Top allocation differences between two stored snapshots (KeyError if unknown)"""
+        base, target = self._snapshots[base_id], self._snapshots[target_id]
+        stats = target.compare_to(base, "lineno")
+        return {
+            "base": base_id,
+            "target": target_id,
+            "top": [_diff_to_dict(s) for s in stats[:top]],
+        }
+
+    def stop(self):
+        self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,113 @@
+# Versioned static JSON snapshots of the public content API, served by nginx without Python
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped; nginx falls back to .gz
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "latest.json"
+# Every publish recompresses each file, so trade a few percent of size for much faster encoding
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def _write_variants(path: Path, data: bytes):
+    """``path`` plus precompressed ``.gz`` / ``.br`` siblings for gzip_static / brotli_static"""
+    path.write_bytes(data)
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=BROTLI_QUALITY))
+
+
+class SnapshotPublisher:
+    """Publishes ``render()`` output as ``v<revision>/<name>.json`` files under ``root``.
+
+    A version directory is written under a temporary name and renamed into
+    place, then ``latest.json`` (revision + file URLs) is atomically replaced, so
+    readers never see a partial snapshot. Version directories are immutable and
+    the ``keep`` newest are retained for clients holding an older manifest.
+    ``schedule`` coalesces bursts of writes into one publish after ``delay``.
+    """
+
+    def __init__(self, root, render: Callable[[], Awaitable[Tuple[int, Dict[str, Any]]]],
+                 url_prefix: str = "/content", keep: int = 5, delay: float = 1.0):
+        self.root = Path(root)
+        self.render = render
+        self.url_prefix = url_prefix.rstrip("/")
+        self.keep = max(keep, 2)
+        self.delay = delay
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    def schedule(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Snapshot publish failed: {e}")
+
+    def manifest(self) -> Optional[dict]:
+        try:
+            return json.loads((self.root / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return None
+
+    async def publish(self) -> dict:
+        revision, payloads = await self.render()
+        current = await asyncio.to_thread(self.manifest)
+        if current and current.get("revision") == revision and set(current.get("files", {})) == set(payloads):
+            return current
+        manifest = await asyncio.to_thread(self._write, revision, payloads)
+        logger.info(f"Published content snapshot v{revision} ({len(payloads)} files)")
+        return manifest
+
+    def _write(self, revision: int, payloads: Dict[str, Any]) -> dict:
+        self.root.mkdir(parents=True, exist_ok=True)
+        version = f"v{revision}"
+        target = self.root / version
+        if not target.exists():
+            staging = self.root / f".{version}.{os.getpid()}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+            for name, payload in payloads.items():
+                _write_variants(staging / f"{name}.json", encode(payload))
+            os.rename(staging, target)
+
+        manifest = {
+            "revision": revision,
+            "publishedAt": datetime.now(timezone.utc).isoformat(),
+            "files": {name: f"{self.url_prefix}/{version}/{name}.json" for name in payloads},
+        }
+        staging = self.root / f".{MANIFEST}.{os.getpid()}.tmp"
+        staging.write_bytes(encode(manifest))
+        os.replace(staging, self.root / MANIFEST)
+        self._prune()
+        return manifest
+
+    def _prune(self):
+        versions = sorted((p for p in self.root.glob("v*") if p.is_dir() and p.name[1:].isdigit()),
+                          key=lambda p: int(p.name[1:]), reverse=True)
+        for old in versions[self.keep:]:
+            shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,304 @@
+# Query-shape profiler for MongoDB commands issued through Motor
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Commands worth profiling; everything else (ping, hello, explain, auth...) is ignored
+PROFILED_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "insert", "findAndModify", "getMore"}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Fields of each read command that affect its plan (everything else, e.g. driver session fields, is dropped)
+_PLAN_FIELDS = {
+    "find": ("filter", "sort", "projection", "hint", "skip", "limit", "collation"),
+    "aggregate": ("pipeline", "hint", "collation"),
+    "count": ("query", "hint", "collation"),
+    "distinct": ("key", "query", "hint", "collation"),
+}
+
+# Upper bound on remembered cursor ids (cursors that are never exhausted are not reported back)
+MAX_OPEN_CURSORS = 10000
+
+
+def _normalize(value):
+    """Replace literal values by '?' while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        if value and all(isinstance(v, dict) for v in value):
+            return [_normalize(v) for v in value]
+        return ["?"]
+    return "?"
+
+
+def _compact(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    """Extract collection, filter, sort and projection shape from a command document"""
+    collection = command.get(command_name)
+    filter_, sort, projection = None, None, None
+    if command_name == "find":
+        filter_, sort, projection = command.get("filter"), command.get("sort"), command.get("projection")
+    elif command_name == "findAndModify":
+        filter_, sort, projection = command.get("query"), command.get("sort"), command.get("fields")
+    elif command_name in ("count", "distinct"):
+        filter_ = command.get("query")
+        if command_name == "distinct":
+            projection = {command.get("key"): 1}
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        filter_ = statements[0].get("q")
+    elif command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), "?")
+            stages.append({name: _normalize(stage[name])} if name == "$match" else name)
+        return {
+            "collection": collection if isinstance(collection, str) else "?",
+            "op": command_name,
+            "filter": _compact(stages),
+            "sort": None,
+            "projection": None,
+        }
+
+    return {
+        "collection": collection if isinstance(collection, str) else "?",
+        "op": command_name,
+        "filter": _compact(_normalize(filter_ or {})),
+        "sort": _compact(sort) if sort else None,
+        "projection": _compact(sorted(projection)) if projection else None,
+    }
+
+
+def explain_command(command_name: str, command: dict):
+    """The command to explain for a shape, without document payloads; None when not explainable.
+
+    Writes are explained as the find for their filter, so inserted documents and
+    update bodies are never kept.
+    """
+    collection = command.get(command_name)
+    if command_name in _PLAN_FIELDS:
+        return {command_name: collection,
+                **{k: command[k] for k in _PLAN_FIELDS[command_name] if k in command}}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        statement = statements[0]
+        return {"find": collection, "filter": statement.get("q", {}),
+                **{k: statement[k] for k in ("hint", "collation") if k in statement}}
+    if command_name == "findAndModify":
+        return {"find": collection, "filter": command.get("query", {}), "limit": 1,
+                **{k: command[k] for k in ("sort", "hint", "collation") if k in command}}
+    return None
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain winningPlan tree"""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def _winning_plans(explain: dict):
+    if "queryPlanner" in explain:
+        yield explain["queryPlanner"].get("winningPlan", {})
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor", {})
+        if "queryPlanner" in cursor:
+            yield cursor["queryPlanner"].get("winningPlan", {})
+
+
+class _ShapeStats:
+    __slots__ = ("shape", "count", "errors", "total", "max", "samples", "sample_command", "plan")
+
+    def __init__(self, shape: dict, sample_command: Optional[dict], max_samples: int):
+        self.shape = shape
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)
+        self.sample_command = sample_command
+        self.plan = None
+
+    def to_dict(self) -> dict:
+        durations = sorted(self.samples)
+        return {
+            **self.shape,
+            "count": self.count,
+            "errors": self.errors,
+            "totalMs": round(self.total * 1000, 2),
+            "meanMs": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50Ms": round(_percentile(durations, 50) * 1000, 3),
+            "p95Ms": round(_percentile(durations, 95) * 1000, 3),
+            "p99Ms": round(_percentile(durations, 99) * 1000, 3),
+            "maxMs": round(self.max * 1000, 3),
+            "plan": self.plan,
+        }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Aggregates MongoDB commands by query shape and samples explain for new shapes.
+
+    Listener callbacks run on Motor's executor threads, so state is guarded by a
+    lock; explains are run from an asyncio task started with ``start()``.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0, max_samples: int = 1000):
+        self.slow_query_ms = slow_query_ms
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._stats = {}
+        self._cursor_shapes = {}
+        self._pending = deque()
+        self._client = None
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._started_at = datetime.now(timezone.utc).isoformat()
+
+    # ----- CommandListener -----
+    def started(self, event):
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        command = event.command
+        shape, cursor_id = None, None
+        with self._lock:
+            if event.command_name == "getMore":
+                # Attribute cursor batches to the shape that opened the cursor
+                cursor_id = command.get("getMore")
+                key = self._cursor_shapes.get(cursor_id)
+            else:
+                shape = query_shape(event.command_name, command)
+                key = (event.database_name,) + tuple(shape.values())
+            if key is None:
+                return
+            self._inflight[(event.connection_id, event.request_id)] = (key, cursor_id)
+            if key not in self._stats and shape is not None:
+                sample = None
+                if event.command_name in EXPLAINABLE_COMMANDS:
+                    sample = explain_command(event.command_name, command)
+                self._stats[key] = _ShapeStats(shape, sample, self.max_samples)
+                if sample is not None:
+                    self._pending.append((event.database_name, key))
+                    if self._loop is not None:
+                        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def succeeded(self, event):
+        key, cursor_id = self._finish(event, failed=False)
+        if key is None or event.command_name not in ("find", "aggregate", "getMore"):
+            return
+        next_cursor_id = (event.reply.get("cursor") or {}).get("id")
+        with self._lock:
+            if event.command_name == "getMore":
+                if not next_cursor_id:
+                    self._cursor_shapes.pop(cursor_id, None)
+            elif next_cursor_id:
+                if len(self._cursor_shapes) >= MAX_OPEN_CURSORS:
+                    self._cursor_shapes.clear()
+                self._cursor_shapes[next_cursor_id] = key
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        seconds = event.duration_micros / 1e6
+        with self._lock:
+            key, cursor_id = self._inflight.pop((event.connection_id, event.request_id), (None, None))
+            stats = self._stats.get(key)
+            if stats is None:
+                return key, cursor_id
+            stats.count += 1
+            stats.errors += int(failed)
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.samples.append(seconds)
+        if seconds * 1000 >= self.slow_query_ms:
+            logger.warning(json.dumps({"event": "slow_query", "durationMs": round(seconds * 1000, 2), **stats.shape}))
+        return key, cursor_id
+
+    # ----- explain sampling -----
+    def start(self, client):
+        """Start the background task that explains newly seen shapes"""
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._explain_loop())
+        if self._pending:
+            self._wakeup.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+    async def _explain_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                database, key = self._pending.popleft()
+                await self._explain(database, key)
+
+    async def _explain(self, database: str, key):
+        stats = self._stats.get(key)
+        if stats is None or stats.sample_command is None:
+            return
+        command = dict(stats.sample_command)
+        if "aggregate" in command:
+            command["cursor"] = {}
+        try:
+            result = await self._client[database].command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as e:
+            stats.plan = {"error": str(e)}
+            return
+        stages = [stage for plan in _winning_plans(result) for stage in _plan_stages(plan)]
+        stats.plan = {"stages": stages, "collectionScan": "COLLSCAN" in stages}
+        if "COLLSCAN" in stages:
+            logger.warning(json.dumps({"event": "collection_scan", **stats.shape}))
+
+    # ----- reporting -----
+    def report(self) -> dict:
+        with self._lock:
+            shapes = [stats.to_dict() for stats in self._stats.values()]
+        shapes.sort(key=lambda s: s["totalMs"], reverse=True)
+        return {
+            "since": self._started_at,
+            "slowQueryMs": self.slow_query_ms,
+            "collectionScans": [s for s in shapes if s["plan"] and s["plan"].get("collectionScan")],
+            "shapes": shapes,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._cursor_shapes.clear()
+            self._pending.clear()
+            self._started_at = datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,199 @@
+# Precomputed "related products" lists, maintained incrementally as products change
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_WEIGHT = 3.0
+TYPE_WEIGHT = 2.0
+TAG_WEIGHT = 2.0  # scaled by the Jaccard overlap of benefits + features
+PRICE_WEIGHT = 1.0  # scaled by how close the base prices are
+
+
+class _Entry(NamedTuple):
+    category: str
+    type: str
+    price: float
+    tags: frozenset
+
+
+def _entry(product: dict) -> _Entry:
+    tags = [*(product.get("benefits") or []), *(product.get("features") or [])]
+    price = product.get("basePrice")
+    return _Entry(
+        category=product.get("category") or "",
+        type=product.get("type") or "",
+        price=float(price) if isinstance(price, (int, float)) else 0.0,
+        tags=frozenset(str(t).strip().lower() for t in tags),
+    )
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def similarity(a: _Entry, b: _Entry, tag_overlap=_jaccard) -> float:
+    score = 0.0
+    if a.category and a.category == b.category:
+        score += CATEGORY_WEIGHT
+    if a.type and a.type == b.type:
+        score += TYPE_WEIGHT
+    score += TAG_WEIGHT * tag_overlap(a.tags, b.tags)
+    score += PRICE_WEIGHT * (1 - min(1.0, abs(a.price - b.price) / max(a.price, b.price, 1.0)))
+    return score
+
+
+class RelatedIndex:
+    """Top-``k`` related product ids per product.
+
+    Candidates are the ``window`` nearest-priced products on each side within the
+    same category and within the same type, so building is O(n * window) rather
+    than comparing every pair. Lookups are a dict access.
+    """
+
+    def __init__(self, k: int = 8, window: int = 10):
+        self.k = k
+        self.window = window
+        self._entries: Dict[str, _Entry] = {}
+        self._groups: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}  # (field, value) -> sorted (price, id)
+        self._lists: Dict[str, List[Tuple[float, str]]] = {}
+        self._referrers: Dict[str, Set[str]] = {}  # id -> ids whose list contains it
+        self._builds = 0  # rebuilds in flight
+        self._generation = 0
+        self._pending: Dict[str, Optional[dict]] = {}
+        # Many products share the same benefits/features lists, so overlaps are memoized
+        self._overlaps: Dict[Tuple[frozenset, frozenset], float] = {}
+
+    def _tag_overlap(self, a: frozenset, b: frozenset) -> float:
+        key = (a, b)
+        overlap = self._overlaps.get(key)
+        if overlap is None:
+            if len(self._overlaps) > 100000:
+                self._overlaps.clear()
+            overlap = self._overlaps[key] = _jaccard(a, b)
+        return overlap
+
+    def __len__(self):
+        return len(self._entries)
+
+    def related(self, product_id: str) -> List[str]:
+        return [pid for _, pid in self._lists.get(product_id, ())]
+
+    @staticmethod
+    def _group_keys(entry: _Entry):
+        return [key for key in (("category", entry.category), ("type", entry.type)) if key[1]]
+
+    def _candidates(self, product_id: str) -> Set[str]:
+        entry = self._entries[product_id]
+        candidates = set()
+        for key in self._group_keys(entry):
+            group = self._groups.get(key, [])
+            index = bisect_left(group, (entry.price, product_id))
+            for _, pid in group[max(0, index - self.window):index + self.window + 1]:
+                candidates.add(pid)
+        candidates.discard(product_id)
+        return candidates
+
+    def _compute(self, product_id: str) -> List[Tuple[float, str]]:
+        entry = self._entries[product_id]
+        scored = [(round(similarity(entry, self._entries[pid], self._tag_overlap), 4), pid)
+                  for pid in self._candidates(product_id)]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:self.k]
+
+    def _set_list(self, product_id: str, ranked: List[Tuple[float, str]]):
+        old = {pid for _, pid in self._lists.get(product_id, ())}
+        new = {pid for _, pid in ranked}
+        for pid in old - new:
+            self._referrers.get(pid, set()).discard(product_id)
+        for pid in new - old:
+            self._referrers.setdefault(pid, set()).add(product_id)
+        self._lists[product_id] = ranked
+
+    def _insert(self, product_id: str, entry: _Entry):
+        self._entries[product_id] = entry
+        for key in self._group_keys(entry):
+            insort(self._groups.setdefault(key, []), (entry.price, product_id))
+
+    def _unlink(self, product_id: str) -> Set[str]:
+        """Drop a product; returns the ids whose lists referenced it"""
+        entry = self._entries.pop(product_id)
+        for key in self._group_keys(entry):
+            group = self._groups[key]
+            index = bisect_left(group, (entry.price, product_id))
+            if index < len(group) and group[index][1] == product_id:
+                del group[index]
+            if not group:
+                del self._groups[key]
+        self._set_list(product_id, [])
+        del self._lists[product_id]
+        return self._referrers.pop(product_id, set())
+
+    @classmethod
+    def built(cls, products, k: int = 8, window: int = 10) -> "RelatedIndex":
+        index = cls(k, window)
+        for product in products:
+            entry = _entry(product)
+            index._entries[product["id"]] = entry
+            for key in cls._group_keys(entry):
+                index._groups.setdefault(key, []).append((entry.price, product["id"]))
+        for group in index._groups.values():
+            group.sort()
+        for product_id in index._entries:
+            index._set_list(product_id, index._compute(product_id))
+        return index
+
+    def replace(self, other: "RelatedIndex"):
+        for name in ("_entries", "_groups", "_lists", "_referrers", "_overlaps"):
+            setattr(self, name, getattr(other, name))
+
+    def upsert(self, product: dict):
+        """Recompute the product's list and those of its neighbours (old and new)"""
+        product_id = product["id"]
+        affected = set()
+        if product_id in self._entries:
+            affected = self._candidates(product_id) | self._unlink(product_id)
+        self._insert(product_id, _entry(product))
+        self._set_list(product_id, self._compute(product_id))
+        for pid in affected | self._candidates(product_id):
+            self._set_list(pid, self._compute(pid))
+
+    def remove(self, product_id: str):
+        if product_id not in self._entries:
+            return
+        for pid in self._candidates(product_id) | self._unlink(product_id):
+            self._set_list(pid, self._compute(pid))
+
+    def product_changed(self, product_id: str, product: Optional[dict]):
+        """Apply a change now and, while a rebuild runs, replay it on the rebuilt index"""
+        if self._builds:
+            self._pending[product_id] = product
+        if product is None:
+            self.remove(product_id)
+        else:
+            self.upsert(product)
+
+    async def rebuild(self, products: List[dict]):
+        """Build a fresh index in a worker thread and swap it in; the old one serves meanwhile.
+
+        Only the most recently started rebuild is swapped in.
+        """
+        self._generation += 1
+        generation = self._generation
+        self._builds += 1
+        try:
+            fresh = await asyncio.to_thread(RelatedIndex.built, products, self.k, self.window)
+            if generation != self._generation:
+                return
+            self.replace(fresh)
+            pending, self._pending = self._pending, {}
+            for product_id, product in pending.items():
+                if product is None:
+                    self.remove(product_id)
+                else:
+                    self.upsert(product)
+            logger.info(f"Related products index built for {len(self)} products")
+        finally:
+            self._builds -= 1
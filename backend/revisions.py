@@ -0,0 +1,102 @@
+# Content revisions and deletion tombstones for incremental (delta) sync
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+COUNTER_ID = "content_revision"
+PRUNED_ID = "tombstones_pruned_through"
+
+
+class RevisionLog:
+    """Monotonically increasing content revisions kept in the ``counters`` collection.
+
+    Every content write takes a revision with ``allocate`` and stamps it on the
+    documents it touches; deletions leave tombstones carrying the revision.
+    Each write takes its own revision with one ``$inc`` on the shared counter,
+    so every process writing to the database (several workers, the
+    ``catalog_generator`` CLI) draws from the same sequence. ``stable_revision`` never passes a write of this process that is still in
+    flight, so a client syncing up to it cannot skip a lower revision that is
+    committed later. Writes report what they touched with ``changed`` (and
+    ``tombstone``); ``on_commit`` listeners hear about it once the ``allocate``
+    block completes, i.e. when ``/api/sync`` can already return it.
+    """
+
+    def __init__(self, db_getter, retention_days: float = 30, prune_interval: float = 3600):
+        self._db = db_getter
+        self.retention = timedelta(days=retention_days)
+        self.prune_interval = prune_interval
+        self._in_flight = Counter()
+        self._last_prune = 0.0
+        self._changes: Dict[int, List[Tuple[str, Optional[List[str]], bool]]] = {}
+        # (collection, ids or None for "reload the collection", deleted, revision)
+        self.on_commit: List[Callable[[str, Optional[List[str]], bool, int], None]] = []
+
+    @asynccontextmanager
+    async def allocate(self):
+        counter = await self._db().counters.find_one_and_update(
+            {"_id": COUNTER_ID}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        revision = counter["value"]
+        self._in_flight[revision] += 1
+        try:
+            yield revision
+        finally:
+            self._in_flight[revision] -= 1
+            if not self._in_flight[revision]:
+                del self._in_flight[revision]
+            changes = self._changes.pop(revision, [])
+        for collection, ids, deleted in changes:
+            for callback in self.on_commit:
+                callback(collection, ids, deleted, revision)
+
+    def changed(self, collection: str, ids: Optional[List[str]], revision: int, deleted: bool = False):
+        """Record documents written under ``revision`` (None: the whole collection)"""
+        if ids is None or ids:
+            self._changes.setdefault(revision, []).append((collection, ids, deleted))
+
+    async def _counter(self, counter_id: str) -> int:
+        counter = await self._db().counters.find_one({"_id": counter_id})
+        return counter["value"] if counter else 0
+
+    async def stable_revision(self) -> int:
+        current = await self._counter(COUNTER_ID)
+        if self._in_flight:
+            return min(current, min(self._in_flight) - 1)
+        return current
+
+    async def tombstone(self, collection: str, ids: List[str], revision: int):
+        if ids:
+            self.changed(collection, ids, revision, deleted=True)
+            deleted_at = datetime.now(timezone.utc).isoformat()
+            await self._db().tombstones.insert_many(
+                [{"collection": collection, "id": doc_id, "revision": revision, "deletedAt": deleted_at} for doc_id in ids]
+            )
+
+    async def deletions(self, since: int, until: int) -> Dict[str, List[str]]:
+        """Deleted ids per collection with since < revision <= until"""
+        deleted = {}
+        query = {"revision": {"$gt": since, "$lte": until}}
+        async for stone in self._db().tombstones.find(query, {"_id": 0, "collection": 1, "id": 1}):
+            deleted.setdefault(stone["collection"], []).append(stone["id"])
+        return deleted
+
+    async def pruned_through(self) -> int:
+        """Tombstones up to this revision are gone; older cursors need a full sync"""
+        if time.monotonic() - self._last_prune > self.prune_interval:
+            await self.prune()
+        return await self._counter(PRUNED_ID)
+
+    async def prune(self):
+        self._last_prune = time.monotonic()
+        cutoff = (datetime.now(timezone.utc) - self.retention).isoformat()
+        old = await self._db().tombstones.find({"deletedAt": {"$lt": cutoff}}, {"_id": 0, "revision": 1}) \
+            .sort("revision", -1).limit(1).to_list(1)
+        if old:
+            await self._db().counters.update_one(
+                {"_id": PRUNED_ID}, {"$max": {"value": old[0]["revision"]}}, upsert=True
+            )
+            await self._db().tombstones.delete_many({"revision": {"$lte": old[0]["revision"]}})
@@ -0,0 +1,426 @@
+# In-memory inverted index for product search and typeahead
+import asyncio
+import heapq
+import logging
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from typing import Awaitable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Field -> weight of one occurrence; category names are indexed under "category"
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "shortDescription": 1.5, "benefits": 1.0, "description": 1.0}
+STOPWORDS = {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+             "or", "the", "to", "with", "your", "our", "this", "that"}
+SUMMARY_FIELDS = ("id", "name", "slug", "category", "type", "basePrice", "image")
+# Terms in at least this many products keep their postings as bitmaps too (dropped below half of it)
+DENSE_POSTINGS = 512
+# Queries whose rarest term has at most this many postings score those products directly
+SCAN_POSTINGS = 512
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    return [w for w in _TOKEN.findall(text.lower()) if w not in STOPWORDS]
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Light suffix stripping so 'cashews'/'cashew' and 'roasted'/'roasting' share a term"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed", "ly"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]  # 'roasting' -> 'roast', 'chopped' -> 'chop'
+            break
+    return word
+
+
+def _field_text(product: dict, field: str, category_names: Dict[str, str]) -> str:
+    if field == "category":
+        slug = product.get("category") or ""
+        return f"{category_names.get(slug, '')} {slug.replace('-', ' ')}"
+    value = product.get(field)
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return value if isinstance(value, str) else ""
+
+
+def _bitmap(slots: Iterable[int], size: int) -> int:
+    """An int with the bits at ``slots`` set (``size`` bounds the slots)"""
+    bits = bytearray((size >> 3) + 1)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _high_bits(bitmap: int, skip: int = 0) -> Iterator[int]:
+    """Positions of the set bits, highest first, after the first ``skip``"""
+    if skip:
+        lo, hi = 0, bitmap.bit_length()  # lowest position with only ``skip`` bits at or above it
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (bitmap >> mid).bit_count() <= skip:
+                hi = mid
+            else:
+                lo = mid + 1
+        bitmap &= (1 << lo) - 1
+    while bitmap:
+        low = max(0, bitmap.bit_length() - 1024)  # peel off small windows instead of shifting the whole int per bit
+        window = bitmap >> low
+        while window:
+            bit = window.bit_length() - 1
+            yield low + bit
+            window ^= 1 << bit
+        bitmap &= (1 << low) - 1
+
+
+@lru_cache(maxsize=16384)
+def _field_terms(field: str, text: str):
+    """(stem, weight) pairs and surface words of one field; category and benefit texts repeat across products"""
+    field_weight = FIELD_WEIGHTS[field]
+    counts = Counter(words(text))
+    terms = {}
+    for word, count in counts.items():
+        term = stem(word)
+        terms[term] = terms.get(term, 0.0) + (field_weight * (1 + math.log(count)) if count > 1 else field_weight)
+    return tuple(terms.items()), tuple(counts)
+
+
+class _Tiers:
+    """Score tiers of one query group within the matches: disjoint bitmaps, best score first.
+
+    A product scores its best alternative term, so with several alternatives a
+    tier only keeps the products not already in a better one. Bitmaps are
+    computed as the ranking reaches them.
+    """
+
+    def __init__(self, entries: List[tuple], matches: int, disjoint: bool):
+        self.entries = sorted(entries, key=lambda entry: entry[0], reverse=True)  # (score, bitmap)
+        self.matches = matches
+        self.disjoint = disjoint
+        self.bitmaps: List[int] = []
+        self.covered = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def score(self, i: int) -> float:
+        return self.entries[i][0]
+
+    def bitmap(self, i: int) -> int:
+        while len(self.bitmaps) <= i:
+            bitmap = self.entries[len(self.bitmaps)][1] & self.matches
+            if not self.disjoint:
+                bitmap, self.covered = bitmap ^ (bitmap & self.covered), self.covered | bitmap
+            self.bitmaps.append(bitmap)
+        return self.bitmaps[i]
+
+
+class SearchIndex:
+    """Term -> {product id: weight} postings plus a sorted vocabulary for prefix lookups.
+
+    Every product also has a small integer slot, and terms found in many
+    products mirror their postings as one bitmap per distinct weight, updated
+    a bit at a time on writes. Matching and counting common terms is then a
+    few big-int ANDs, and the top results come from the best scoring
+    combinations of those weight tiers without sorting any postings. Queries
+    with an uncommon term just score that term's products.
+
+    Not thread-safe: ``rebuild`` builds a fresh index in a worker thread, swaps
+    it in on the event loop and replays the writes made meanwhile.
+    """
+
+    def __init__(self):
+        self.category_names: Dict[str, str] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._tiers: Dict[str, Dict[float, int]] = {}  # dense term -> weight -> bitmap of slots
+        self._bitmaps: Dict[str, int] = {}  # dense term -> bitmap of all its slots
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._docs: Dict[str, dict] = {}
+        self._doc_words: Dict[str, List[str]] = {}
+        self._surface: Dict[str, int] = {}  # surface word -> number of products containing it
+        self._vocabulary: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []  # slot -> product id
+        self._free: List[int] = []
+        self._builds = 0  # rebuilds in flight
+        self._generation = 0
+        self._pending: Dict[str, Optional[dict]] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _analyze(self, product: dict):
+        """(stem -> weight, distinct surface words) for one product"""
+        weights = {}
+        surface = set()
+        for field in FIELD_WEIGHTS:
+            text = _field_text(product, field, self.category_names)
+            if not text:
+                continue
+            terms, field_words = _field_terms(field, text)
+            surface.update(field_words)
+            for term, weight in terms:
+                weights[term] = weights.get(term, 0.0) + weight
+        return weights, list(surface)
+
+    @classmethod
+    def built(cls, products, category_names: Optional[Dict[str, str]] = None) -> "SearchIndex":
+        """A new index over ``products``; category names are indexed by slug"""
+        index = cls()
+        index.category_names = dict(category_names or {})
+        for product in products:
+            index._add(product, incremental=False)
+        index._vocabulary = sorted(index._surface)
+        for term, postings in index._postings.items():
+            if len(postings) >= DENSE_POSTINGS:
+                index._make_dense(term)
+        return index
+
+    def replace(self, other: "SearchIndex"):
+        for name in ("category_names", "_postings", "_tiers", "_bitmaps", "_doc_terms", "_docs", "_doc_words",
+                     "_surface", "_vocabulary", "_slots", "_ids", "_free"):
+            setattr(self, name, getattr(other, name))
+
+    def _tier_bitmaps(self, term: str) -> Dict[float, int]:
+        by_weight = {}
+        for product_id, weight in self._postings[term].items():
+            by_weight.setdefault(weight, []).append(self._slots[product_id])
+        return {weight: _bitmap(slots, len(self._ids)) for weight, slots in by_weight.items()}
+
+    def _make_dense(self, term: str):
+        tiers = self._tiers[term] = self._tier_bitmaps(term)
+        bitmap = 0
+        for tier in tiers.values():
+            bitmap |= tier
+        self._bitmaps[term] = bitmap
+
+    def _add(self, product: dict, incremental: bool = True):
+        """Index a product; ``incremental`` keeps the vocabulary and bitmaps current as it goes"""
+        product_id = product["id"]
+        weights, surface = self._analyze(product)
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = product_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(product_id)
+        self._slots[product_id] = slot
+        self._doc_terms[product_id] = weights
+        self._docs[product_id] = {k: product.get(k) for k in SUMMARY_FIELDS}
+        bit = 1 << slot
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+            postings[product_id] = weight
+            if not incremental:
+                continue
+            tiers = self._tiers.get(term)
+            if tiers is not None:
+                tiers[weight] = tiers.get(weight, 0) | bit
+                self._bitmaps[term] |= bit
+            elif len(postings) >= DENSE_POSTINGS:
+                self._make_dense(term)
+        for word in surface:
+            if word in self._surface:
+                self._surface[word] += 1
+            else:
+                self._surface[word] = 1
+                if incremental:
+                    insort(self._vocabulary, word)
+        self._doc_words[product_id] = surface
+
+    def remove(self, product_id: str):
+        weights = self._doc_terms.pop(product_id, None)
+        self._docs.pop(product_id, None)
+        if weights is None:
+            return
+        slot = self._slots.pop(product_id)
+        self._ids[slot] = None
+        self._free.append(slot)
+        bit = 1 << slot
+        for term, weight in weights.items():
+            postings = self._postings[term]
+            del postings[product_id]
+            tiers = self._tiers.get(term)
+            if tiers is not None:
+                if len(postings) < DENSE_POSTINGS // 2:
+                    del self._tiers[term], self._bitmaps[term]
+                else:
+                    remaining = tiers[weight] ^ bit
+                    if remaining:
+                        tiers[weight] = remaining
+                    else:
+                        del tiers[weight]
+                    self._bitmaps[term] ^= bit
+            if not postings:
+                del self._postings[term]
+        for word in self._doc_words.pop(product_id):
+            self._surface[word] -= 1
+            if not self._surface[word]:
+                del self._surface[word]
+                index = bisect_left(self._vocabulary, word)
+                if index < len(self._vocabulary) and self._vocabulary[index] == word:
+                    del self._vocabulary[index]
+
+    def upsert(self, product: dict):
+        self.remove(product["id"])
+        self._add(product)
+
+    def product_changed(self, product_id: str, product: Optional[dict]):
+        """Apply a change now and, while a rebuild runs, replay it on the rebuilt index"""
+        if self._builds:
+            self._pending[product_id] = product
+        if product is None:
+            self.remove(product_id)
+        else:
+            self.upsert(product)
+
+    def rebuild(self, products: List[dict], category_names: Dict[str, str]) -> Awaitable[None]:
+        """Build a fresh index in a worker thread and swap it in; the old one serves meanwhile.
+
+        The rebuild counts as started when this is called, so changes made before
+        the returned awaitable first runs (e.g. while it waits as a background
+        task) are replayed too. Only the most recently started rebuild is swapped in.
+        """
+        self._generation += 1
+        self._builds += 1
+        return self._build(products, category_names, self._generation)
+
+    async def _build(self, products: List[dict], category_names: Dict[str, str], generation: int):
+        try:
+            fresh = await asyncio.to_thread(SearchIndex.built, products, category_names)
+            if generation != self._generation:
+                return
+            self.replace(fresh)
+            pending, self._pending = self._pending, {}
+            for product_id, product in pending.items():
+                if product is None:
+                    self.remove(product_id)
+                else:
+                    self.upsert(product)
+            logger.info(f"Search index built for {len(self)} products")
+        finally:
+            self._builds -= 1
+
+    def _idf(self, term: str) -> float:
+        return math.log(1 + len(self._docs) / (1 + len(self._postings.get(term, ()))))
+
+    def _summary(self, product_id: str, score: float) -> dict:
+        return {**self._docs[product_id], "score": round(score, 3)}
+
+    def _rank(self, term_groups: List[List[str]], limit: int, offset: int = 0):
+        """Top products matching every group; a group is a set of alternative terms (a prefix expansion)"""
+        term_groups = [g for g in term_groups if g]
+        groups = [[t for t in g if t in self._postings] for g in term_groups]
+        if not groups or not all(groups):
+            return 0, []
+        idf = {t: self._idf(t) for g in groups for t in g}
+        sizes = [sum(len(self._postings[t]) for t in g) for g in groups]
+        if min(sizes) <= SCAN_POSTINGS:
+            return self._rank_scan(groups[sizes.index(min(sizes))], groups, idf, limit, offset)
+        return self._rank_tiers(groups, idf, limit, offset)
+
+    def _rank_scan(self, driver: List[str], groups: List[List[str]], idf: Dict[str, float], limit: int, offset: int):
+        """Score every product of the smallest group"""
+        scores = {}
+        for product_id in {pid for t in driver for pid in self._postings[t]}:
+            score = 0.0
+            for group in groups:
+                best = max(self._postings[t].get(product_id, 0.0) * idf[t] for t in group)
+                if not best:
+                    break
+                score += best
+            else:
+                scores[product_id] = score
+        slots = self._slots
+        ranked = heapq.nlargest(offset + limit, scores, key=lambda pid: (scores[pid], slots[pid]))[offset:]
+        return len(scores), [self._summary(pid, scores[pid]) for pid in ranked]
+
+    def _tier_entries(self, term: str, idf: float):
+        tiers = self._tiers.get(term)
+        if tiers is None:
+            tiers = self._tier_bitmaps(term)
+        return [(weight * idf, bitmap) for weight, bitmap in tiers.items()]
+
+    def _rank_tiers(self, groups: List[List[str]], idf: Dict[str, float], limit: int, offset: int):
+        """Walk combinations of per-group weight tiers best first; every product in one scores the same"""
+        matches = None
+        for group in groups:
+            bitmap = 0
+            for term in group:
+                bitmap |= self._bitmaps[term] if term in self._bitmaps else _bitmap(
+                    (self._slots[pid] for pid in self._postings[term]), len(self._ids))
+            matches = bitmap if matches is None else matches & bitmap
+        total = matches.bit_count()
+        if not total:
+            return 0, []
+        tiers = [_Tiers([e for t in group for e in self._tier_entries(t, idf[t])], matches, len(group) == 1)
+                 for group in groups]
+
+        start = (0,) * len(tiers)
+        heap = [(-sum(t.score(0) for t in tiers), start)]
+        queued = {start}
+        results, skip, walked = [], offset, 0
+        while heap and len(results) < limit and walked < total:
+            negative, combo = heapq.heappop(heap)
+            bitmap = tiers[0].bitmap(combo[0])
+            for tier, i in zip(tiers[1:], combo[1:]):
+                if not bitmap:
+                    break
+                bitmap &= tier.bitmap(i)
+            count = bitmap.bit_count()
+            walked += count
+            if count > skip:
+                for slot in islice(_high_bits(bitmap, skip), limit - len(results)):
+                    results.append(self._summary(self._ids[slot], -negative))
+                skip = 0
+            else:
+                skip -= count
+            for g, i in enumerate(combo):
+                if i + 1 < len(tiers[g]):
+                    successor = combo[:g] + (i + 1,) + combo[g + 1:]
+                    if successor not in queued:
+                        queued.add(successor)
+                        heapq.heappush(heap, (-sum(t.score(j) for t, j in zip(tiers, successor)), successor))
+        return total, results
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> dict:
+        terms = list(dict.fromkeys(stem(w) for w in words(query)))
+        total, results = self._rank([[t] for t in terms], limit, offset)
+        return {"query": query, "total": total, "results": results}
+
+    def completions(self, prefix: str, limit: int = 10) -> List[str]:
+        """Vocabulary words starting with ``prefix``, most frequent first"""
+        index = bisect_left(self._vocabulary, prefix)
+        candidates = []
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            candidates.append(self._vocabulary[index])
+            index += 1
+        return heapq.nlargest(limit, candidates, key=self._surface.__getitem__)
+
+    def suggest(self, query: str, limit: int = 8) -> dict:
+        """Word completions for the last (partial) word and the best matching products"""
+        query_words = words(query)
+        if not query_words or query.endswith(" "):
+            return {"query": query, "completions": [], "products": self.search(query, limit)["results"]}
+        completions = self.completions(query_words[-1], limit)
+        groups = [[stem(w)] for w in query_words[:-1]]
+        groups.append(list(dict.fromkeys(stem(w) for w in completions)))
+        _, products = self._rank(groups, limit) if groups[-1] else (0, [])
+        return {"query": query, "completions": completions, "products": products}
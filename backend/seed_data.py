@@ -1,6 +1,13 @@
 # Seed data for DryFruto website
 import uuid
 
+# Namespace for deterministic ids: reseeding keeps the same id for the same natural key
+ID_NAMESPACE = uuid.UUID("6f1c2b0e-5d0a-4d8e-9a57-3c1b8f0d2e41")
+
+
+def stable_id(kind: str, key: str) -> str:
+    return str(uuid.uuid5(ID_NAMESPACE, f"{kind}:{key}"))
+
 LOGO_URL = "https://customer-assets.emergentagent.com/job_70b8c44d-b0eb-46ab-b798-c90870274405/artifacts/5olvlaa7_WhatsApp%20Image%202025-12-26%20at%2013.46.33.jpeg"
 
 site_settings = {
@@ -20,42 +27,36 @@ site_settings = {
 
 categories = [
     {
-        "id": str(uuid.uuid4()),
         "name": "Nuts & Dry Fruits",
         "slug": "nuts-dry-fruits",
         "image": "https://images.pexels.com/photos/1295572/pexels-photo-1295572.jpeg?auto=compress&cs=tinysrgb&w=600",
         "icon": "https://images.pexels.com/photos/1013420/pexels-photo-1013420.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Dates",
         "slug": "dates",
         "image": "https://images.pexels.com/photos/5945755/pexels-photo-5945755.jpeg?auto=compress&cs=tinysrgb&w=600",
         "icon": "https://images.pexels.com/photos/5945755/pexels-photo-5945755.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Mix Dry Fruits",
         "slug": "mix-dry-fruits",
         "image": "https://images.pexels.com/photos/86649/pexels-photo-86649.jpeg?auto=compress&cs=tinysrgb&w=600",
         "icon": "https://images.pexels.com/photos/86649/pexels-photo-86649.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Makhana",
         "slug": "makhana",
         "image": "https://images.pexels.com/photos/7446005/pexels-photo-7446005.jpeg?auto=compress&cs=tinysrgb&w=600",
         "icon": "https://images.pexels.com/photos/7446005/pexels-photo-7446005.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Seeds",
         "slug": "seeds",
         "image": "https://images.pexels.com/photos/4750274/pexels-photo-4750274.jpeg?auto=compress&cs=tinysrgb&w=600",
         "icon": "https://images.pexels.com/photos/4750274/pexels-photo-4750274.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Gift Boxes",
         "slug": "gift-boxes",
         "image": "https://images.pexels.com/photos/264892/pexels-photo-264892.jpeg?auto=compress&cs=tinysrgb&w=600",
@@ -65,7 +66,6 @@ categories = [
 
 products = [
     {
-        "id": str(uuid.uuid4()),
         "name": "Premium California Almonds",
         "slug": "premium-california-almonds",
         "category": "nuts-dry-fruits",
@@ -89,7 +89,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Jumbo Cashews Premium",
         "slug": "jumbo-cashews-premium",
         "category": "nuts-dry-fruits",
@@ -112,7 +111,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Roasted Salted Cashews",
         "slug": "roasted-salted-cashews",
         "category": "nuts-dry-fruits",
@@ -135,7 +133,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Premium Walnut Kernels",
         "slug": "premium-walnut-kernels",
         "category": "nuts-dry-fruits",
@@ -158,7 +155,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Afghan Black Raisins",
         "slug": "afghan-black-raisins",
         "category": "nuts-dry-fruits",
@@ -181,7 +177,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Premium Mix Dry Fruits",
         "slug": "premium-mix-dry-fruits",
         "category": "mix-dry-fruits",
@@ -204,7 +199,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Pista Akbari Premium",
         "slug": "pista-akbari-premium",
         "category": "nuts-dry-fruits",
@@ -227,7 +221,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Makhana Plain Premium",
         "slug": "makhana-plain-premium",
         "category": "makhana",
@@ -250,7 +243,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Premium Dried Figs (Anjeer)",
         "slug": "premium-dried-figs",
         "category": "nuts-dry-fruits",
@@ -273,7 +265,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Pumpkin Seeds Raw",
         "slug": "pumpkin-seeds-raw",
         "category": "seeds",
@@ -296,7 +287,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Sunflower Seeds Raw",
         "slug": "sunflower-seeds-raw",
         "category": "seeds",
@@ -319,7 +309,6 @@ products = [
         "features": ["Healthy Heart", "High Nutrition", "Gluten Free", "Cholesterol Free"]
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Medjool Dates Premium",
         "slug": "medjool-dates-premium",
         "category": "dates",
@@ -345,7 +334,6 @@ products = [
 
 hero_slides = [
     {
-        "id": str(uuid.uuid4()),
         "title": "Premium Quality Dry Fruits",
         "subtitle": "Live With Health",
         "description": "Discover our handpicked selection of premium dry fruits, nuts, and seeds",
@@ -353,7 +341,6 @@ hero_slides = [
         "cta": "Shop Now"
     },
     {
-        "id": str(uuid.uuid4()),
         "title": "Festival Gift Hampers",
         "subtitle": "Celebrate with Health",
         "description": "Beautiful gift boxes perfect for every occasion",
@@ -361,7 +348,6 @@ hero_slides = [
         "cta": "View Collection"
     },
     {
-        "id": str(uuid.uuid4()),
         "title": "Healthy Seeds & Makhana",
         "subtitle": "Nature's Best",
         "description": "Explore our range of nutrient-rich seeds and fox nuts",
@@ -372,37 +358,31 @@ hero_slides = [
 
 testimonials = [
     {
-        "id": str(uuid.uuid4()),
         "name": "Priya Sharma",
         "review": "Excellent quality dry fruits! I've been ordering from DryFruto for over a year now. The almonds and cashews are always fresh and delicious.",
         "avatar": "https://images.pexels.com/photos/774909/pexels-photo-774909.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Rajesh Kumar",
         "review": "Best place for premium dry fruits. The packaging is excellent and delivery is always on time. Highly recommended!",
         "avatar": "https://images.pexels.com/photos/220453/pexels-photo-220453.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Anita Patel",
         "review": "The gift boxes are perfect for occasions. Ordered for Diwali and everyone loved them. Great quality products!",
         "avatar": "https://images.pexels.com/photos/415829/pexels-photo-415829.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Mohammed Ali",
         "review": "Fresh and premium quality nuts. The Makhana is especially good - crispy and tasty. Will order again!",
         "avatar": "https://images.pexels.com/photos/91227/pexels-photo-91227.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Sunita Verma",
         "review": "Amazing customer service and product quality. The dates are the best I've ever had. Thank you DryFruto!",
         "avatar": "https://images.pexels.com/photos/1239291/pexels-photo-1239291.jpeg?auto=compress&cs=tinysrgb&w=100"
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Vikram Singh",
         "review": "Top-notch quality with amazing flavor. The mix dry fruits pack is perfect for daily snacking. Highly satisfied!",
         "avatar": "https://images.pexels.com/photos/2379004/pexels-photo-2379004.jpeg?auto=compress&cs=tinysrgb&w=100"
@@ -411,39 +391,47 @@ testimonials = [
 
 gift_boxes = [
     {
-        "id": str(uuid.uuid4()),
         "name": "Premium Gift Hamper",
         "image": "https://images.pexels.com/photos/5945770/pexels-photo-5945770.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 1499
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Festive Delight Box",
         "image": "https://images.pexels.com/photos/4033324/pexels-photo-4033324.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 1999
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Corporate Gift Set",
         "image": "https://images.pexels.com/photos/264892/pexels-photo-264892.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 2499
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Royal Collection Box",
         "image": "https://images.pexels.com/photos/1028714/pexels-photo-1028714.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 3499
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Anniversary Special",
         "image": "https://images.pexels.com/photos/5945759/pexels-photo-5945759.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 2999
     },
     {
-        "id": str(uuid.uuid4()),
         "name": "Diwali Gift Box",
         "image": "https://images.pexels.com/photos/4033321/pexels-photo-4033321.jpeg?auto=compress&cs=tinysrgb&w=500",
         "price": 1799
     }
 ]
+
+# Natural key of each seeded collection; seeding upserts by these and ids derive from them
+NATURAL_KEYS = {
+    "categories": "slug",
+    "products": "slug",
+    "hero_slides": "title",
+    "testimonials": "name",
+    "gift_boxes": "name",
+}
+
+for _kind, _docs in (("categories", categories), ("products", products), ("hero_slides", hero_slides),
+                     ("testimonials", testimonials), ("gift_boxes", gift_boxes)):
+    for _doc in _docs:
+        _doc["id"] = stable_id(_kind, _doc[NATURAL_KEYS[_kind]])
@@ -1,29 +1,73 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, Header, Request, Response, Body
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
+from typing import Any, Dict, List, Literal, Optional, Union
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import base64
+from timing import DBTimingListener, ServerTimingMiddleware, TimedJSONResponse, TimedRoute
+from query_profiler import QueryProfiler
+from loop_monitor import LoopMonitor
+from profiling import MemoryProfiler, collapsed, sample_cpu
+from catalog_cache import CatalogCache
+from search_index import SearchIndex
+from related_index import RelatedIndex
+from revisions import RevisionLog
+from events import Broadcaster
+from publisher import SnapshotPublisher
+from sitemaps import SitemapGenerator
+import merge_patch
+import pricing
+import theme_css
+import seed_data
+import asyncio
+import hashlib
+import json
+import time
+from urllib.parse import urlencode
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (command listeners feed Server-Timing and the query-shape profiler)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+query_profiler = QueryProfiler(slow_query_ms=float(os.environ.get('SLOW_QUERY_MS', '100')))
+client = AsyncIOMotorClient(mongo_url, event_listeners=[DBTimingListener(), query_profiler])
 db = client[os.environ['DB_NAME']]
 
+# Event loop lag monitor (stacks of blocking callbacks are captured only in debug mode)
+loop_monitor = LoopMonitor(
+    block_threshold=float(os.environ.get('LOOP_BLOCK_THRESHOLD_MS', '100')) / 1000,
+    capture_stacks=os.environ.get('LOOP_DEBUG', 'false').lower() == 'true',
+)
+
+# In-memory product catalog, refreshed on every product write made through the API
+catalog_cache = CatalogCache(lambda: db.products, ttl=float(os.environ.get('CATALOG_CACHE_TTL', '300')))
+search_index = SearchIndex()
+related_index = RelatedIndex()
+
+# Content revisions and deletion tombstones for /api/sync
+revision_log = RevisionLog(lambda: db, retention_days=float(os.environ.get('TOMBSTONE_RETENTION_DAYS', '30')))
+
+# Live change notifications for /api/events
+broadcaster = Broadcaster(
+    queue_size=int(os.environ.get('EVENTS_QUEUE_SIZE', '100')),
+    heartbeat=float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15')),
+)
+
 # Create the main app without a prefix
 app = FastAPI()
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+# Create a router with the /api prefix (routes record phase timings for Server-Timing)
+api_router = APIRouter(prefix="/api", route_class=TimedRoute, default_response_class=TimedJSONResponse)
 
 # ============== MODELS ==============
 
@@ -41,11 +85,18 @@ class StatusCheckCreate(BaseModel):
 class Category(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    version: int = 0  # bumped on every update; sent as ETag / checked via If-Match
+    revision: int = 0  # global content revision of the last write, for /api/sync
     name: str
     slug: str
     image: str
     icon: str
 
+class CategoryWithStats(Category):
+    productCount: Optional[int] = None
+    minPrice: Optional[float] = None
+    maxPrice: Optional[float] = None
+
 class CategoryCreate(BaseModel):
     name: str
     slug: str
@@ -62,6 +113,8 @@ class CategoryUpdate(BaseModel):
 class Product(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    version: int = 0  # bumped on every update; sent as ETag / checked via If-Match
+    revision: int = 0  # global content revision of the last write, for /api/sync
     name: str
     slug: str
     category: str
@@ -110,6 +163,8 @@ class ProductUpdate(BaseModel):
 class HeroSlide(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    version: int = 0  # bumped on every update; sent as ETag / checked via If-Match
+    revision: int = 0  # global content revision of the last write, for /api/sync
     title: str
     subtitle: str
     description: str
@@ -134,6 +189,8 @@ class HeroSlideUpdate(BaseModel):
 class Testimonial(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    version: int = 0  # bumped on every update; sent as ETag / checked via If-Match
+    revision: int = 0  # global content revision of the last write, for /api/sync
     name: str
     review: str
     avatar: str
@@ -152,6 +209,8 @@ class TestimonialUpdate(BaseModel):
 class GiftBox(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    version: int = 0  # bumped on every update; sent as ETag / checked via If-Match
+    revision: int = 0  # global content revision of the last write, for /api/sync
     name: str
     image: str
     price: float
@@ -167,9 +226,17 @@ class GiftBoxUpdate(BaseModel):
     price: Optional[float] = None
 
 # Site Settings Model
+class PricingTier(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    minKg: float = Field(ge=0)
+    discountPercent: float = Field(ge=0, le=100)
+    label: str = ""
+
 class SiteSettings(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = "site_settings"
+    version: int = 0
+    revision: int = 0
     businessName: str = "DryFruto"
     slogan: str = "Live With Health"
     logo: str = ""
@@ -191,6 +258,11 @@ class SiteSettings(BaseModel):
         "Regular supply contracts available",
         "Quality testing certificates provided"
     ]
+    # Order-weight discount tiers used by /api/quote
+    bulkPricingTiers: List[PricingTier] = [
+        PricingTier(minKg=10, discountPercent=5, label="Bulk order (10 kg+)"),
+        PricingTier(minKg=100, discountPercent=10, label="Special rate (100 kg+)")
+    ]
     # About Us Page Settings
     aboutHeroSubtitle: str = "Your trusted partner for premium quality dry fruits, nuts, and seeds since 2014."
     aboutStoryParagraphs: List[str] = [
@@ -280,6 +352,8 @@ class SiteSettings(BaseModel):
     }
     # Page-specific CSS styles
     pageStyles: dict = {}
+    # Derived, not stored: content-hashed stylesheet compiled from theme + pageStyles
+    themeCssUrl: str = ""
 
 class SiteSettingsUpdate(BaseModel):
     businessName: Optional[str] = None
@@ -296,6 +370,7 @@ class SiteSettingsUpdate(BaseModel):
     youtubeLink: Optional[str] = None
     bulkOrderProductTypes: Optional[List[str]] = None
     bulkOrderBenefits: Optional[List[str]] = None
+    bulkPricingTiers: Optional[List[PricingTier]] = None
     # About Us Page Settings
     aboutHeroSubtitle: Optional[str] = None
     aboutStoryParagraphs: Optional[List[str]] = None
@@ -312,6 +387,52 @@ class SiteSettingsUpdate(BaseModel):
     # Page-specific CSS styles
     pageStyles: Optional[dict] = None
 
+# Price Adjustment Model
+class PriceAdjustment(BaseModel):
+    mode: Literal["percent", "absolute"] = "percent"
+    value: float
+    category: Optional[str] = None
+    type: Optional[str] = None
+    all: bool = False  # must be set to adjust every product when no filter is given
+    roundTo: float = 0  # round new prices to a multiple of this (0 = keep two decimals)
+    rounding: Literal["nearest", "up", "down"] = "nearest"  # nearest rounds halves up
+    includeVariants: bool = True
+    dryRun: bool = False
+
+# Bulk Operation Models
+class BulkOperation(BaseModel):
+    op: str  # insert, update, delete
+    id: Optional[str] = None
+    version: Optional[int] = None  # optional optimistic-concurrency check for update/delete
+    data: Optional[dict] = None
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+
+# Product Batch Fetch Model
+class ProductBatchRequest(BaseModel):
+    ids: List[str]
+
+# Quote Models
+class QuoteLine(BaseModel):
+    productId: str
+    variant: Optional[str] = None  # priceVariants key, e.g. "250g" (default 100g)
+    quantity: int = 1
+
+class QuoteRequest(BaseModel):
+    lines: List[QuoteLine]
+
+# Batch Request Models
+class BatchItem(BaseModel):
+    method: str = "GET"
+    path: str  # e.g. "/api/products/abc" (may include a query string)
+    query: Optional[Dict[str, Union[str, int, float, bool, List[str]]]] = None
+    body: Optional[Any] = None  # sent as JSON
+    headers: Optional[Dict[str, str]] = None  # e.g. If-Match
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
 # Form Submission Models
 class BulkOrderSubmission(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -332,6 +453,86 @@ class NewsletterSubscription(BaseModel):
     email: str
     createdAt: str = ""
 
+# ============== HELPERS ==============
+
+def update_fields(update: BaseModel) -> dict:
+    """Fields explicitly set on a *Update model (None means "leave unchanged")"""
+    return {k: v for k, v in update.model_dump().items() if v is not None}
+
+def parse_status_check_timestamps(status_checks: List[dict]) -> List[dict]:
+    """Convert ISO timestamp strings stored in Mongo back to datetimes in place"""
+    for check in status_checks:
+        if isinstance(check['timestamp'], str):
+            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
+    return status_checks
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Version from an If-Match header ('"3"', 'W/"3"'); None for absent or '*'"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a version ETag such as \"3\"")
+
+def set_etag(response: Response, doc: dict):
+    response.headers["ETag"] = f'"{doc.get("version", 0)}"'
+
+async def update_document(collection, doc_id: str, update: BaseModel, response: Response,
+                          if_match: Optional[str] = None, not_found: str = "Not found", upsert: bool = False) -> dict:
+    """Apply a *Update model atomically and return the updated document in one round trip.
+
+    Bumps the document version; with If-Match the update only applies when the
+    stored version still matches (412 otherwise).
+    """
+    update_data = update_fields(update)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No data to update")
+    query = {"id": doc_id}
+    expected = parse_if_match(if_match)
+    if expected is not None:
+        # Documents written before versioning have no field, which counts as version 0
+        query["version"] = expected if expected else {"$in": [0, None]}
+    async with revision_log.allocate() as revision:
+        changes = {"$set": {**update_data, "revision": revision}, "$inc": {"version": 1}}
+        updated = await collection.find_one_and_update(
+            query, changes, projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+            upsert=upsert and expected is None,
+        )
+        if updated is None and expected is not None:
+            if await collection.count_documents({"id": doc_id}, limit=1):
+                raise HTTPException(status_code=412, detail="Document was modified by someone else; reload and retry")
+            if upsert and expected == 0:
+                # Nothing stored yet, so version 0 (the defaults) is current
+                updated = await collection.find_one_and_update(
+                    {"id": doc_id}, changes, projection={"_id": 0}, return_document=ReturnDocument.AFTER, upsert=True
+                )
+        if updated is not None:
+            revision_log.changed(collection.name, [doc_id], revision)
+    if updated is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    set_etag(response, updated)
+    return updated
+
+async def insert_content(collection, obj: BaseModel) -> BaseModel:
+    """insert_one for a content model, stamped with a new revision"""
+    async with revision_log.allocate() as revision:
+        obj.revision = revision
+        await collection.insert_one(obj.model_dump())
+        revision_log.changed(collection.name, [obj.id], revision)
+    return obj
+
+async def delete_content(collection, doc_id: str) -> bool:
+    """delete_one for a content document, leaving a tombstone for /api/sync"""
+    async with revision_log.allocate() as revision:
+        result = await collection.delete_one({"id": doc_id})
+        if result.deleted_count:
+            await revision_log.tombstone(collection.name, [doc_id], revision)
+    return bool(result.deleted_count)
+
 # ============== ROUTES ==============
 
 @api_router.get("/")
@@ -361,78 +562,324 @@ async def create_status_check(input: StatusCheckCreate):
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
     status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
-    return status_checks
+    return parse_status_check_timestamps(status_checks)
 
 # ----- Category Routes -----
-@api_router.get("/categories", response_model=List[Category])
-async def get_categories():
+async def categories_changed():
+    """Category names are searchable: renames re-index the catalog in the background"""
+    catalog_cache.touch()
+    products = await catalog_cache.products()
+    names = await category_names()
+    if names != search_index.category_names:
+        in_background(search_index.rebuild(list(products.values()), names))
+
+async def compute_categories_with_stats() -> List[dict]:
+    """Categories plus product count and basePrice range from one $group over products"""
+    categories, stats = await asyncio.gather(
+        db.categories.find({}, {"_id": 0}).to_list(100),
+        db.products.aggregate([{"$group": {
+            "_id": "$category",
+            "productCount": {"$sum": 1},
+            "minPrice": {"$min": "$basePrice"},
+            "maxPrice": {"$max": "$basePrice"},
+        }}]).to_list(None),
+    )
+    by_slug = {row.pop("_id"): row for row in stats}
+    return [{**category, **by_slug.get(category["slug"], {"productCount": 0})} for category in categories]
+
+@api_router.get("/categories", response_model=List[CategoryWithStats], response_model_exclude_none=True)
+async def get_categories(withStats: bool = False):
+    """All categories; withStats=true adds productCount/minPrice/maxPrice (cached per catalog version)"""
+    if withStats:
+        return await catalog_cache.derived("categories_with_stats", compute_categories_with_stats)
     categories = await db.categories.find({}, {"_id": 0}).to_list(100)
     return categories
 
 @api_router.post("/categories", response_model=Category)
 async def create_category(category: CategoryCreate):
-    category_obj = Category(**category.model_dump())
-    await db.categories.insert_one(category_obj.model_dump())
+    category_obj = await insert_content(db.categories, Category(**category.model_dump()))
+    await categories_changed()
     return category_obj
 
 @api_router.put("/categories/{category_id}", response_model=Category)
-async def update_category(category_id: str, category: CategoryUpdate):
-    update_data = {k: v for k, v in category.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    result = await db.categories.update_one({"id": category_id}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Category not found")
-    updated = await db.categories.find_one({"id": category_id}, {"_id": 0})
+async def update_category(category_id: str, category: CategoryUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document(db.categories, category_id, category, response, if_match, not_found="Category not found")
+    await categories_changed()
     return Category(**updated)
 
 @api_router.delete("/categories/{category_id}")
 async def delete_category(category_id: str):
-    result = await db.categories.delete_one({"id": category_id})
-    if result.deleted_count == 0:
+    if not await delete_content(db.categories, category_id):
         raise HTTPException(status_code=404, detail="Category not found")
+    await categories_changed()
     return {"message": "Category deleted"}
 
 # ----- Product Routes -----
+MAX_BATCH_IDS = 1000
+
+def parse_product_ids(ids: List[str]) -> List[str]:
+    """Non-empty ids, de-duplicated in request order"""
+    ids = list(dict.fromkeys(i.strip() for i in ids if i and i.strip()))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
+async def fetch_products_by_ids(ids: List[str]):
+    """Products in request order plus the ids that do not exist"""
+    found = await catalog_cache.get_many(ids)
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
 @api_router.get("/products", response_model=List[Product])
-async def get_products():
+async def get_products(response: Response, ids: Optional[str] = None):
+    """All products, or with ?ids=a,b,c just those (in that order; missing ids in X-Missing-Ids)"""
+    if ids is not None:
+        products, missing = await fetch_products_by_ids(parse_product_ids(ids.split(",")))
+        response.headers["X-Missing-Ids"] = ",".join(missing)
+        return products
     products = await db.products.find({}, {"_id": 0}).to_list(1000)
     return products
 
+@api_router.post("/products/batch")
+async def get_products_batch(request: ProductBatchRequest):
+    """Batch fetch for long id lists (cart, wishlist)"""
+    products, missing = await fetch_products_by_ids(parse_product_ids(request.ids))
+    return {"products": [Product(**p) for p in products], "missing": missing}
+
+DEFAULT_PRICE_BUCKETS = "0,100,250,500,1000"
+
+def parse_price_buckets(price_buckets: str) -> List[float]:
+    try:
+        boundaries = [float(b) for b in price_buckets.split(",") if b.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="priceBuckets must be comma-separated numbers")
+    if len(boundaries) < 2 or boundaries != sorted(set(boundaries)):
+        raise HTTPException(status_code=400, detail="priceBuckets needs at least two ascending boundaries")
+    return boundaries
+
+async def compute_product_facets(category: Optional[str], type: Optional[str], min_price: Optional[float],
+                                 max_price: Optional[float], boundaries: List[float]) -> dict:
+    """Facet counts in one $facet aggregation; each facet applies every active filter except its own"""
+    price = {k: v for k, v in (("$gte", min_price), ("$lt", max_price)) if v is not None}
+    filters = {"category": category, "type": type, "basePrice": price or None}
+
+    def match(exclude: Optional[str] = None) -> dict:
+        return {"$match": {k: v for k, v in filters.items() if v is not None and k != exclude}}
+
+    result = await db.products.aggregate([{"$facet": {
+        "total": [match(), {"$count": "n"}],
+        "category": [match("category"), {"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+        "type": [match("type"), {"$group": {"_id": "$type", "count": {"$sum": 1}}}],
+        "price": [match("basePrice"), {"$bucket": {
+            "groupBy": "$basePrice", "boundaries": boundaries, "default": "other",
+            "output": {"count": {"$sum": 1}},
+        }}],
+    }}]).to_list(1)
+    facets = result[0] if result else {}
+    counts = {row["_id"]: row["count"] for row in facets.get("price", [])}
+    buckets = [{"min": low, "max": high, "count": counts.get(low, 0)} for low, high in zip(boundaries, boundaries[1:])]
+    if counts.get("other"):
+        # Prices outside the boundaries (normally just those above the last one)
+        buckets.append({"min": boundaries[-1], "max": None, "count": counts["other"]})
+
+    def ranked(rows):
+        return sorted(({"value": r["_id"], "count": r["count"]} for r in rows), key=lambda r: (-r["count"], str(r["value"])))
+
+    return {
+        "total": facets["total"][0]["n"] if facets.get("total") else 0,
+        "category": ranked(facets.get("category", [])),
+        "type": ranked(facets.get("type", [])),
+        "price": buckets,
+    }
+
+@api_router.get("/products/facets")
+async def get_product_facets(category: Optional[str] = None, type: Optional[str] = None,
+                             minPrice: Optional[float] = None, maxPrice: Optional[float] = None,
+                             priceBuckets: str = DEFAULT_PRICE_BUCKETS):
+    """Filter sidebar counts per category, type and basePrice bucket, cached per catalog version"""
+    boundaries = parse_price_buckets(priceBuckets)
+    key = ("facets", category, type, minPrice, maxPrice, tuple(boundaries))
+    return await catalog_cache.derived(key, lambda: compute_product_facets(category, type, minPrice, maxPrice, boundaries))
+
 @api_router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
+async def get_product(product_id: str, response: Response):
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    set_etag(response, product)
     return Product(**product)
 
+@api_router.get("/products/{product_id}/related", response_model=List[Product])
+async def get_related_products(product_id: str, limit: int = 8):
+    """Precomputed related products (shared category/type, benefits/features, similar price)"""
+    products = await catalog_cache.products()
+    if product_id not in products:
+        raise HTTPException(status_code=404, detail="Product not found")
+    related = (products.get(pid) for pid in related_index.related(product_id)[:max(limit, 0)])
+    return [p for p in related if p is not None]
+
+def price_expression(price, adjustment: PriceAdjustment) -> dict:
+    """Aggregation expression applying an adjustment to a numeric price expression"""
+    if adjustment.mode == "percent":
+        adjusted = {"$multiply": [price, 1 + adjustment.value / 100]}
+    else:
+        adjusted = {"$add": [price, adjustment.value]}
+    # $round rounds halves to even (2.5 -> 2), so "nearest" is floor(x + 0.5): halves go up
+    if adjustment.roundTo > 0:
+        scaled = {"$divide": [adjusted, adjustment.roundTo]}
+        if adjustment.rounding == "nearest":
+            rounded = {"$floor": {"$add": [scaled, 0.5]}}
+        else:
+            rounded = {{"up": "$ceil", "down": "$floor"}[adjustment.rounding]: scaled}
+        adjusted = {"$multiply": [rounded, adjustment.roundTo]}
+    else:
+        adjusted = {"$divide": [{"$floor": {"$add": [{"$multiply": [adjusted, 100]}, 0.5]}}, 100]}
+    return {"$max": [adjusted, 0]}
+
+def price_adjustment_fields(adjustment: PriceAdjustment) -> dict:
+    """New basePrice (and priceVariants) as aggregation expressions; non-numeric variants are kept"""
+    fields = {"basePrice": price_expression("$basePrice", adjustment)}
+    if adjustment.includeVariants:
+        fields["priceVariants"] = {"$arrayToObject": {"$map": {
+            "input": {"$objectToArray": {"$ifNull": ["$priceVariants", {}]}},
+            "as": "variant",
+            "in": {
+                "k": "$$variant.k",
+                "v": {"$cond": [{"$isNumber": "$$variant.v"},
+                                price_expression("$$variant.v", adjustment), "$$variant.v"]},
+            },
+        }}}
+    return fields
+
+@api_router.post("/products/price-adjustment")
+async def adjust_product_prices(adjustment: PriceAdjustment):
+    """Adjust basePrice and every price variant of matching products in one server-side update_many"""
+    query = {k: v for k, v in (("category", adjustment.category), ("type", adjustment.type)) if v is not None}
+    if not query and not adjustment.all:
+        raise HTTPException(status_code=400, detail="Give a category/type filter or set all=true")
+    fields = price_adjustment_fields(adjustment)
+
+    if adjustment.dryRun:
+        # Compute the diff inside Mongo; only a sample of rows comes back
+        projection = {"_id": 0, "id": 1, "name": 1, "basePrice": 1, "priceVariants": 1,
+                      **{f"new{k[0].upper()}{k[1:]}": v for k, v in fields.items()}}
+        result = await db.products.aggregate([
+            {"$match": query},
+            {"$facet": {
+                "count": [{"$count": "n"}],
+                "sample": [{"$limit": 100}, {"$project": projection}],
+            }},
+        ]).to_list(1)
+        facet = result[0] if result else {"count": [], "sample": []}
+        return {
+            "dryRun": True,
+            "matched": facet["count"][0]["n"] if facet["count"] else 0,
+            "changes": facet["sample"],
+        }
+
+    async with revision_log.allocate() as revision:
+        result = await db.products.update_many(query, [
+            {"$set": {**fields, "revision": revision, "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}}},
+        ])
+        revision_log.changed("products", None, revision)
+    catalog_cache.invalidate()
+    return {"dryRun": False, "matched": result.matched_count, "modified": result.modified_count}
+
 @api_router.post("/products", response_model=Product)
 async def create_product(product: ProductCreate):
-    product_obj = Product(**product.model_dump())
-    await db.products.insert_one(product_obj.model_dump())
+    product_obj = await insert_content(db.products, Product(**product.model_dump()))
+    await catalog_cache.products_changed([product_obj.id])
     return product_obj
 
 @api_router.put("/products/{product_id}", response_model=Product)
-async def update_product(product_id: str, product: ProductUpdate):
-    update_data = {k: v for k, v in product.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    result = await db.products.update_one({"id": product_id}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Product not found")
-    updated = await db.products.find_one({"id": product_id}, {"_id": 0})
+async def update_product(product_id: str, product: ProductUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document(db.products, product_id, product, response, if_match, not_found="Product not found")
+    await catalog_cache.products_changed([product_id])
     return Product(**updated)
 
 @api_router.delete("/products/{product_id}")
 async def delete_product(product_id: str):
-    result = await db.products.delete_one({"id": product_id})
-    if result.deleted_count == 0:
+    if not await delete_content(db.products, product_id):
         raise HTTPException(status_code=404, detail="Product not found")
+    await catalog_cache.products_changed([product_id])
     return {"message": "Product deleted"}
 
+# ----- Quote Routes -----
+bulk_pricing_tiers: Optional[List[dict]] = None
+
+async def get_bulk_pricing_tiers() -> List[dict]:
+    """Bulk tiers from site settings, kept in memory until settings change"""
+    global bulk_pricing_tiers
+    if bulk_pricing_tiers is None:
+        settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0, "bulkPricingTiers": 1})
+        bulk_pricing_tiers = []
+        for tier in (settings or {}).get("bulkPricingTiers", SiteSettings().bulkPricingTiers) or []:
+            try:
+                bulk_pricing_tiers.append(PricingTier.model_validate(tier).model_dump())
+            except ValidationError:
+                logger.warning(f"Ignoring invalid bulk pricing tier {tier!r}")  # stored before tiers were validated
+    return bulk_pricing_tiers
+
+def site_settings_changed():
+    global bulk_pricing_tiers, theme_css_hash
+    bulk_pricing_tiers = None
+    theme_css_hash = None
+
+@api_router.post("/quote")
+async def quote_cart(request: QuoteRequest):
+    """Price cart lines from the catalog cache with bulk tiers applied to the order weight"""
+    if len(request.lines) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} lines per quote")
+    if any(line.quantity < 1 for line in request.lines):
+        raise HTTPException(status_code=400, detail="quantity must be at least 1")
+    products = await catalog_cache.get_many({line.productId for line in request.lines})
+    tiers = await get_bulk_pricing_tiers()
+    return pricing.quote([line.model_dump() for line in request.lines], products, tiers)
+
+# ----- Search Routes -----
+MAX_SEARCH_RESULTS = 100
+
+async def category_names() -> Dict[str, str]:
+    return {c["slug"]: c.get("name", "") async for c in db.categories.find({}, {"_id": 0, "slug": 1, "name": 1})}
+
+# The search and related-products indexes are rebuilt in the background after every catalog
+# load (and search after a category rename); the previous index serves meanwhile and writes
+# made during the build are replayed on it
+index_rebuilds = set()
+
+def in_background(rebuild):
+    task = asyncio.create_task(rebuild)
+    index_rebuilds.add(task)
+    task.add_done_callback(index_rebuilds.discard)
+
+async def index_catalog(products: dict):
+    in_background(search_index.rebuild(list(products.values()), await category_names()))
+
+catalog_cache.on_load.append(index_catalog)
+catalog_cache.on_change.append(search_index.product_changed)
+
+async def rebuild_related(products: dict):
+    in_background(related_index.rebuild(list(products.values())))
+
+catalog_cache.on_load.append(rebuild_related)
+catalog_cache.on_change.append(related_index.product_changed)
+
+def search_limit(limit: int) -> int:
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    return min(limit, MAX_SEARCH_RESULTS)
+
+@api_router.get("/search")
+async def search_products(q: str, limit: int = 20, offset: int = 0):
+    """Ranked full-text product search over the in-memory index"""
+    await catalog_cache.products()  # builds the index on first use
+    return search_index.search(q, search_limit(limit), max(offset, 0))
+
+@api_router.get("/search/suggest")
+async def suggest_products(q: str, limit: int = 8):
+    """Typeahead: completions for the word being typed plus the best matching products"""
+    await catalog_cache.products()
+    return search_index.suggest(q, search_limit(limit))
+
 # ----- Hero Slide Routes -----
 @api_router.get("/hero-slides", response_model=List[HeroSlide])
 async def get_hero_slides():
@@ -441,25 +888,17 @@ async def get_hero_slides():
 
 @api_router.post("/hero-slides", response_model=HeroSlide)
 async def create_hero_slide(slide: HeroSlideCreate):
-    slide_obj = HeroSlide(**slide.model_dump())
-    await db.hero_slides.insert_one(slide_obj.model_dump())
+    slide_obj = await insert_content(db.hero_slides, HeroSlide(**slide.model_dump()))
     return slide_obj
 
 @api_router.put("/hero-slides/{slide_id}", response_model=HeroSlide)
-async def update_hero_slide(slide_id: str, slide: HeroSlideUpdate):
-    update_data = {k: v for k, v in slide.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    result = await db.hero_slides.update_one({"id": slide_id}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Hero slide not found")
-    updated = await db.hero_slides.find_one({"id": slide_id}, {"_id": 0})
+async def update_hero_slide(slide_id: str, slide: HeroSlideUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document(db.hero_slides, slide_id, slide, response, if_match, not_found="Hero slide not found")
     return HeroSlide(**updated)
 
 @api_router.delete("/hero-slides/{slide_id}")
 async def delete_hero_slide(slide_id: str):
-    result = await db.hero_slides.delete_one({"id": slide_id})
-    if result.deleted_count == 0:
+    if not await delete_content(db.hero_slides, slide_id):
         raise HTTPException(status_code=404, detail="Hero slide not found")
     return {"message": "Hero slide deleted"}
 
@@ -471,25 +910,17 @@ async def get_testimonials():
 
 @api_router.post("/testimonials", response_model=Testimonial)
 async def create_testimonial(testimonial: TestimonialCreate):
-    testimonial_obj = Testimonial(**testimonial.model_dump())
-    await db.testimonials.insert_one(testimonial_obj.model_dump())
+    testimonial_obj = await insert_content(db.testimonials, Testimonial(**testimonial.model_dump()))
     return testimonial_obj
 
 @api_router.put("/testimonials/{testimonial_id}", response_model=Testimonial)
-async def update_testimonial(testimonial_id: str, testimonial: TestimonialUpdate):
-    update_data = {k: v for k, v in testimonial.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    result = await db.testimonials.update_one({"id": testimonial_id}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Testimonial not found")
-    updated = await db.testimonials.find_one({"id": testimonial_id}, {"_id": 0})
+async def update_testimonial(testimonial_id: str, testimonial: TestimonialUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document(db.testimonials, testimonial_id, testimonial, response, if_match, not_found="Testimonial not found")
     return Testimonial(**updated)
 
 @api_router.delete("/testimonials/{testimonial_id}")
 async def delete_testimonial(testimonial_id: str):
-    result = await db.testimonials.delete_one({"id": testimonial_id})
-    if result.deleted_count == 0:
+    if not await delete_content(db.testimonials, testimonial_id):
         raise HTTPException(status_code=404, detail="Testimonial not found")
     return {"message": "Testimonial deleted"}
 
@@ -501,117 +932,541 @@ async def get_gift_boxes():
 
 @api_router.post("/gift-boxes", response_model=GiftBox)
 async def create_gift_box(gift_box: GiftBoxCreate):
-    gift_box_obj = GiftBox(**gift_box.model_dump())
-    await db.gift_boxes.insert_one(gift_box_obj.model_dump())
+    gift_box_obj = await insert_content(db.gift_boxes, GiftBox(**gift_box.model_dump()))
     return gift_box_obj
 
 @api_router.put("/gift-boxes/{gift_box_id}", response_model=GiftBox)
-async def update_gift_box(gift_box_id: str, gift_box: GiftBoxUpdate):
-    update_data = {k: v for k, v in gift_box.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    result = await db.gift_boxes.update_one({"id": gift_box_id}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Gift box not found")
-    updated = await db.gift_boxes.find_one({"id": gift_box_id}, {"_id": 0})
+async def update_gift_box(gift_box_id: str, gift_box: GiftBoxUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document(db.gift_boxes, gift_box_id, gift_box, response, if_match, not_found="Gift box not found")
     return GiftBox(**updated)
 
 @api_router.delete("/gift-boxes/{gift_box_id}")
 async def delete_gift_box(gift_box_id: str):
-    result = await db.gift_boxes.delete_one({"id": gift_box_id})
-    if result.deleted_count == 0:
+    if not await delete_content(db.gift_boxes, gift_box_id):
         raise HTTPException(status_code=404, detail="Gift box not found")
     return {"message": "Gift box deleted"}
 
+# ----- Bulk Content Routes -----
+# URL segment -> (collection, model, create model, update model)
+CONTENT_COLLECTIONS = {
+    "categories": ("categories", Category, CategoryCreate, CategoryUpdate),
+    "products": ("products", Product, ProductCreate, ProductUpdate),
+    "hero-slides": ("hero_slides", HeroSlide, HeroSlideCreate, HeroSlideUpdate),
+    "testimonials": ("testimonials", Testimonial, TestimonialCreate, TestimonialUpdate),
+    "gift-boxes": ("gift_boxes", GiftBox, GiftBoxCreate, GiftBoxUpdate),
+}
+
+MAX_BULK_OPERATIONS = 1000
+
+async def settle_unmatched(coll, write_results: List[dict], outcome: dict, revision: int):
+    """Correct updates/deletes that matched nothing in bulk_write.
+
+    A write that changed the version or removed the document after the
+    validation lookup makes a version-conditioned op match nothing, which is
+    not a write error. Such ops become conflict (document still there) or
+    not_found instead of being reported as done.
+    """
+    updates = [r for r in write_results if r["status"] == "updated"]
+    deletes = [r for r in write_results if r["status"] == "deleted"]
+    suspects = []
+    if outcome.get("nMatched", 0) < len(updates):
+        query = {"id": {"$in": [r["id"] for r in updates]}, "revision": revision}
+        written = {doc["id"] async for doc in coll.find(query, {"_id": 0, "id": 1})}
+        suspects += [r for r in updates if r["id"] not in written]
+    if outcome.get("nRemoved", 0) < len(deletes):
+        suspects += deletes
+    if not suspects:
+        return
+    query = {"id": {"$in": [r["id"] for r in suspects]}}
+    current = {doc["id"]: doc.get("version", 0) async for doc in coll.find(query, {"_id": 0, "id": 1, "version": 1})}
+    for result in suspects:
+        if result["id"] in current:
+            result.update(status="conflict", detail=f"Current version is {current[result['id']]}")
+        elif result["status"] == "updated":
+            result.update(status="not_found")
+
+@api_router.post("/{collection}/bulk")
+async def bulk_content_operations(collection: str, request: BulkRequest):
+    """Run mixed insert/update/delete operations in one unordered bulk_write with per-item results"""
+    if collection not in CONTENT_COLLECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+    if len(request.operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations per request")
+    collection_name, model, create_model, update_model = CONTENT_COLLECTIONS[collection]
+    coll = db[collection_name]
+
+    # One lookup tells which update/delete targets exist and at which version
+    target_ids = [op.id for op in request.operations if op.op in ("update", "delete") and op.id]
+    if len(set(target_ids)) < len(target_ids):
+        # Later ops on an id would be checked against the version before the earlier ones
+        seen, repeated = set(), []
+        for doc_id in target_ids:
+            if doc_id in seen and doc_id not in repeated:
+                repeated.append(doc_id)
+            seen.add(doc_id)
+        raise HTTPException(status_code=400, detail=f"Each id may be updated or deleted once per request: {', '.join(repeated)}")
+    existing = {}
+    if target_ids:
+        async for doc in coll.find({"id": {"$in": target_ids}}, {"_id": 0, "id": 1, "version": 1}):
+            existing[doc["id"]] = doc.get("version", 0)
+
+    results = []
+    writes, write_results = [], []  # (kind, document or filter, update fields), (result, status)
+    for index, op in enumerate(request.operations):
+        result = {"index": index, "op": op.op, "id": op.id}
+        results.append(result)
+        try:
+            if op.op == "insert":
+                doc = model(**create_model(**(op.data or {})).model_dump()).model_dump()
+                result["id"] = doc["id"]
+                writes.append(("insert", doc, None))
+                write_results.append((result, "inserted"))
+                continue
+            if op.op not in ("update", "delete"):
+                result.update(status="invalid", detail="op must be insert, update or delete")
+                continue
+            if op.id not in existing:
+                result.update(status="not_found")
+                continue
+            if op.version is not None and op.version != existing[op.id]:
+                result.update(status="conflict", detail=f"Current version is {existing[op.id]}")
+                continue
+            query = {"id": op.id}
+            if op.version is not None:
+                query["version"] = op.version if op.version else {"$in": [0, None]}
+            if op.op == "delete":
+                writes.append(("delete", query, None))
+                write_results.append((result, "deleted"))
+                continue
+            update_data = update_fields(update_model(**(op.data or {})))
+            if not update_data:
+                result.update(status="invalid", detail="No data to update")
+                continue
+            writes.append(("update", query, update_data))
+            write_results.append((result, "updated"))
+        except ValidationError as e:
+            result.update(status="invalid", detail=e.errors(include_url=False, include_context=False))
+
+    for result, status in write_results:
+        result["status"] = status
+    if writes:
+        async with revision_log.allocate() as revision:
+            operations = []
+            for kind, target, update_data in writes:
+                if kind == "insert":
+                    operations.append(InsertOne({**target, "revision": revision}))
+                elif kind == "delete":
+                    operations.append(DeleteOne(target))
+                else:
+                    operations.append(UpdateOne(target, {"$set": {**update_data, "revision": revision},
+                                                         "$inc": {"version": 1}}))
+            try:
+                outcome = (await coll.bulk_write(operations, ordered=False)).bulk_api_result
+            except BulkWriteError as e:
+                outcome = e.details
+                for error in e.details.get("writeErrors", []):
+                    result = write_results[error["index"]][0]
+                    result.update(status="error", detail=error.get("errmsg"))
+            await settle_unmatched(coll, [r for r, _ in write_results], outcome, revision)
+            revision_log.changed(collection_name, [r["id"] for r, _ in write_results
+                                                   if r["status"] in ("inserted", "updated")], revision)
+            await revision_log.tombstone(collection_name, [r["id"] for r, _ in write_results if r["status"] == "deleted"],
+                                         revision)
+        if collection == "products":
+            await catalog_cache.products_changed([r["id"] for r, _ in write_results
+                                                  if r["status"] in ("inserted", "updated", "deleted")])
+        elif collection == "categories":
+            await categories_changed()
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"summary": summary, "results": results}
+
 # ----- Site Settings Routes -----
+# Fields the storefront gets from the compiled stylesheet instead (left out with compact=true)
+STYLE_FIELDS = {"theme", "pageStyles"}
+
 @api_router.get("/site-settings", response_model=SiteSettings)
-async def get_site_settings():
+async def get_site_settings(response: Response, compact: bool = False):
+    """Site settings; compact=true leaves out theme/pageStyles, which themeCssUrl already applies"""
     settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0})
-    if not settings:
-        # Return default settings
-        return SiteSettings()
-    return SiteSettings(**settings)
+    result = SiteSettings(**(settings or {}))  # defaults when nothing is stored yet
+    result.themeCssUrl = await theme_css_url()
+    if compact:
+        response = TimedJSONResponse(result.model_dump(exclude=STYLE_FIELDS))
+    if settings:
+        set_etag(response, settings)
+    return response if compact else result
 
 @api_router.put("/site-settings", response_model=SiteSettings)
-async def update_site_settings(settings: SiteSettingsUpdate):
-    update_data = {k: v for k, v in settings.model_dump().items() if v is not None}
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
-    
+async def update_site_settings(settings: SiteSettingsUpdate, response: Response, if_match: Optional[str] = Header(None)):
     # Upsert the settings
-    await db.site_settings.update_one(
-        {"id": "site_settings"},
-        {"$set": update_data},
-        upsert=True
+    updated = await update_document(db.site_settings, "site_settings", settings, response, if_match,
+                                    not_found="Site settings not found", upsert=True)
+    site_settings_changed()
+    return SiteSettings(**{**updated, "themeCssUrl": await theme_css_url()})
+
+# ----- Site Settings Section Routes -----
+# URL segment -> its fields, or the one object field the section exposes directly
+SETTINGS_SECTIONS = {
+    "contact": ["businessName", "slogan", "logo", "phone", "email", "careerEmail", "address", "whatsappLink",
+                "facebookLink", "instagramLink", "twitterLink", "youtubeLink"],
+    "bulk-order": ["bulkOrderProductTypes", "bulkOrderBenefits", "bulkPricingTiers"],
+    "about": ["aboutHeroSubtitle", "aboutStoryParagraphs", "aboutStoryImage", "aboutStats", "aboutVision",
+              "aboutVisionPoints", "aboutMission", "aboutMissionPoints", "aboutValues", "aboutWhyChooseUs"],
+    "theme": "theme",
+    "page-styles": "pageStyles",
+}
+MERGE_PATCH_ATTEMPTS = 5
+
+def settings_section_fields(section: str) -> List[str]:
+    if section not in SETTINGS_SECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown settings section")
+    fields = SETTINGS_SECTIONS[section]
+    return [fields] if isinstance(fields, str) else fields
+
+def section_payload(section: str, settings: Optional[dict]):
+    """The section as served: stored values with the defaults filled in"""
+    full = SiteSettings(**(settings or {})).model_dump()
+    fields = SETTINGS_SECTIONS[section]
+    return full[fields] if isinstance(fields, str) else {field: full[field] for field in fields}
+
+def section_etag(payload) -> str:
+    """Content hash, so each section's ETag only moves when that section changes (whatever the write path)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return f'"{hashlib.sha256(encoded).hexdigest()[:16]}"'
+
+def etag_matches(header: str, etag: str, weak: bool = False) -> bool:
+    """If-Match / If-None-Match check ('*' and lists allowed).
+
+    Only ``weak`` comparison (If-None-Match) accepts W/ validators; If-Match
+    must use strong comparison (RFC 7232 3.1), so a weak one never matches.
+    """
+    candidates = [c.strip() for c in header.split(",")]
+    if "*" in candidates:
+        return True
+    if weak:
+        candidates = [c[2:] if c.startswith("W/") else c for c in candidates]
+    return etag in candidates
+
+@api_router.get("/site-settings/{section}")
+async def get_site_settings_section(section: str, if_none_match: Optional[str] = Header(None)):
+    """One settings section (contact, bulk-order, about, theme, page-styles) with its own ETag"""
+    fields = settings_section_fields(section)
+    settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0, **{f: 1 for f in fields}})
+    payload = section_payload(section, settings)
+    headers = {"ETag": section_etag(payload), "Cache-Control": "no-cache"}
+    if if_none_match and etag_matches(if_none_match, headers["ETag"], weak=True):
+        return Response(status_code=304, headers=headers)
+    return TimedJSONResponse(payload, headers=headers)
+
+@api_router.patch("/site-settings/{section}")
+async def patch_site_settings_section(section: str, patch: Any = Body(...), if_match: Optional[str] = Header(None)):
+    """Apply an RFC 7396 merge patch (application/merge-patch+json) to one settings section.
+
+    The patch becomes dotted-path $set/$unset operations, so a single theme color
+    change writes just that color; null removes a member (top-level fields then
+    fall back to their defaults). If-Match takes the section's ETag; writes to
+    other sections do not conflict with it.
+    """
+    fields = settings_section_fields(section)
+    if not isinstance(patch, dict):
+        raise HTTPException(status_code=400, detail="Merge patch must be a JSON object")
+    single = isinstance(SETTINGS_SECTIONS[section], str)
+    field_patch = {fields[0]: patch} if single else patch
+    unknown = set(field_patch) - set(fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not in the {section} section: {', '.join(sorted(unknown))}")
+
+    for _ in range(MERGE_PATCH_ATTEMPTS):
+        stored = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0})
+        current = section_payload(section, stored)
+        if if_match is not None and not etag_matches(if_match, section_etag(current)):
+            raise HTTPException(status_code=412, detail="Section was modified by someone else; reload and retry")
+        merged = merge_patch.apply(current, patch)
+        merged_fields = {fields[0]: merged} if single else merged
+        candidate = dict(stored or {})
+        for field in field_patch:
+            if field in merged_fields:
+                candidate[field] = merged_fields[field]
+            else:
+                candidate.pop(field, None)
+        try:
+            result = SiteSettings(**candidate)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+        # Fields still on their defaults are not stored, so they are written whole
+        stored_fields = {f: v for f, v in field_patch.items() if f in (stored or {})}
+        try:
+            to_set, to_unset = merge_patch.update_operations(stored_fields, stored or {})
+        except merge_patch.MergePatchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        for field, value in field_patch.items():
+            if field not in stored_fields and value is not None:
+                to_set[field] = getattr(result, field)
+        payload = section_payload(section, result.model_dump())
+        if not to_set and not to_unset:
+            break
+
+        version = (stored or {}).get("version", 0)
+        query = {"id": "site_settings", "version": version if version else {"$in": [0, None]}}
+        async with revision_log.allocate() as revision:
+            update = {"$set": {**to_set, "revision": revision}, "$inc": {"version": 1}}
+            if to_unset:
+                update["$unset"] = to_unset
+            written = await db.site_settings.update_one(query, update, upsert=stored is None)
+            if written.matched_count or written.upserted_id is not None:
+                revision_log.changed("site_settings", ["site_settings"], revision)
+                break
+        # Another write got in between (possibly to a different section): recompute on the new document
+    else:
+        raise HTTPException(status_code=409, detail="Site settings are changing concurrently; retry")
+
+    site_settings_changed()
+    return TimedJSONResponse(payload, headers={"ETag": section_etag(payload), "Cache-Control": "no-cache"})
+
+# ----- Theme Stylesheet Routes -----
+MAX_THEME_STYLESHEETS = 8
+theme_stylesheets: Dict[str, bytes] = {}  # content hash -> minified CSS (recent versions)
+theme_css_hash: Optional[str] = None  # of the current settings; reset by site_settings_changed()
+
+async def compile_theme_stylesheet() -> str:
+    """Compile the stored theme/pageStyles once per settings change; returns the content hash"""
+    global theme_css_hash
+    if theme_css_hash is None:
+        settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0, "theme": 1, "pageStyles": 1})
+        settings = settings or {}
+        defaults = SiteSettings()
+        css = theme_css.compile_css(settings.get("theme", defaults.theme), settings.get("pageStyles", defaults.pageStyles))
+        css_hash = theme_css.content_hash(css)
+        if css_hash not in theme_stylesheets and len(theme_stylesheets) >= MAX_THEME_STYLESHEETS:
+            theme_stylesheets.pop(next(iter(theme_stylesheets)))
+        theme_stylesheets[css_hash] = css.encode()
+        theme_css_hash = css_hash
+    return theme_css_hash
+
+async def theme_css_url() -> str:
+    return f"/api/theme/{await compile_theme_stylesheet()}.css"
+
+@api_router.get("/theme/{css_hash}.css")
+async def get_theme_stylesheet(css_hash: str):
+    """The compiled theme stylesheet; its URL changes with its content, so it is cached forever"""
+    if css_hash not in theme_stylesheets:
+        await compile_theme_stylesheet()
+    css = theme_stylesheets.get(css_hash)
+    if css is None:
+        raise HTTPException(status_code=404, detail="Stylesheet not found")
+    return Response(content=css, media_type="text/css", headers={
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{css_hash}"',
+    })
+
+# ----- Delta Sync Route -----
+# Response key -> collection
+SYNC_COLLECTIONS = {
+    "categories": "categories",
+    "products": "products",
+    "heroSlides": "hero_slides",
+    "testimonials": "testimonials",
+    "giftBoxes": "gift_boxes",
+    "siteSettings": "site_settings",
+}
+
+@api_router.get("/sync")
+async def sync_content(since: int = 0):
+    """Content changed and deleted after revision ``since`` (everything when since=0).
+
+    Apply ``deleted`` before ``changes`` and send the returned ``revision`` as the
+    next ``since``. ``full`` means the client must replace its copy wholesale,
+    e.g. because tombstones for its cursor have been pruned.
+    """
+    revision = await revision_log.stable_revision()
+    full = since <= 0 or since > revision or since < await revision_log.pruned_through()
+    query = {} if full else {"revision": {"$gt": since, "$lte": revision}}
+    docs = await asyncio.gather(*(db[name].find(query, {"_id": 0}).to_list(None) for name in SYNC_COLLECTIONS.values()))
+    changes = {key: found for key, found in zip(SYNC_COLLECTIONS, docs) if found}
+    deleted = {}
+    if not full:
+        by_collection = await revision_log.deletions(since, revision)
+        deleted = {key: by_collection[name] for key, name in SYNC_COLLECTIONS.items() if name in by_collection}
+    return {"revision": revision, "full": full, "changes": changes, "deleted": deleted}
+
+# ----- Live Update Routes -----
+SYNC_KEYS = {name: key for key, name in SYNC_COLLECTIONS.items()}
+
+def publish_change(collection: str, ids: Optional[List[str]], deleted: bool, revision: int):
+    """Fan a committed write out to /api/events subscribers, keyed like /api/sync"""
+    key = SYNC_KEYS.get(collection)
+    if key is not None:
+        data = {"collection": key, "revision": revision, "deleted" if deleted else "ids": ids}
+        broadcaster.publish("change", data, event_id=str(revision))
+
+revision_log.on_commit.append(publish_change)
+
+@api_router.get("/events")
+async def content_events():
+    """Server-Sent Events stream of content changes.
+
+    Each ``change`` event carries the collection (as in /api/sync), the revision
+    and either the changed ``ids`` (null: reload the whole collection) or the
+    ``deleted`` ids. The event id is the revision, so a client that reconnects or
+    receives ``overflow`` catches up with ``/api/sync?since=<last event id>``.
+    """
+    return StreamingResponse(broadcaster.stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ----- Static Content Snapshots -----
+# Snapshot file -> (bootstrap key, collection, response model); the files mirror the GET routes
+PUBLISHED_CONTENT = {
+    "categories": ("categories", "categories", Category),
+    "products": ("products", "products", Product),
+    "hero-slides": ("heroSlides", "hero_slides", HeroSlide),
+    "testimonials": ("testimonials", "testimonials", Testimonial),
+    "gift-boxes": ("giftBoxes", "gift_boxes", GiftBox),
+}
+
+def build_snapshots(docs: dict, settings: Optional[dict], css_url: str) -> dict:
+    payloads = {name: [model(**doc).model_dump() for doc in docs[name]]
+                for name, (_, _, model) in PUBLISHED_CONTENT.items()}
+    site_settings = SiteSettings(**{**(settings or {}), "themeCssUrl": css_url})
+    payloads["site-settings"] = site_settings.model_dump()
+    # The catalog is by far the largest file: bootstrap points at products.json in the same version instead
+    payloads["bootstrap"] = {
+        **{key: payloads[name] for name, (key, _, _) in PUBLISHED_CONTENT.items() if name != "products"},
+        "productsFile": "products.json",
+        "siteSettings": site_settings.model_dump(exclude=STYLE_FIELDS),  # as site-settings?compact=true
+    }
+    return payloads
+
+async def render_snapshots():
+    """(revision, file name -> payload) for the snapshot publisher"""
+    revision = await revision_log.stable_revision()
+    found = await asyncio.gather(*(
+        db[collection].find({}, {"_id": 0}).to_list(None) for _, collection, _ in PUBLISHED_CONTENT.values()
+    ))
+    settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0})
+    payloads = await asyncio.to_thread(build_snapshots, dict(zip(PUBLISHED_CONTENT, found)), settings,
+                                       await theme_css_url())
+    return revision, payloads
+
+# Disabled unless PUBLISH_DIR is set (a directory nginx serves under PUBLISH_URL_PREFIX)
+publisher = None
+if os.environ.get('PUBLISH_DIR'):
+    publisher = SnapshotPublisher(
+        os.environ['PUBLISH_DIR'], render_snapshots,
+        url_prefix=os.environ.get('PUBLISH_URL_PREFIX', '/content'),
+        keep=int(os.environ.get('PUBLISH_KEEP_VERSIONS', '5')),
+    )
+    revision_log.on_commit.append(lambda *change: publisher.schedule())
+
+    async def publish_if_stale(products: dict):
+        """Catalog reloads pick up writes from other processes (e.g. catalog_generator); publish those too"""
+        manifest = await asyncio.to_thread(publisher.manifest)
+        if manifest is None or manifest.get("revision") != await revision_log.stable_revision():
+            publisher.schedule()
+
+    catalog_cache.on_load.append(publish_if_stale)
+
+# ----- Sitemaps & Product Feed -----
+# Disabled unless SITEMAP_DIR (served by nginx at the site root) and SITE_URL (the storefront origin) are set
+sitemaps = None
+if os.environ.get('SITEMAP_DIR') and os.environ.get('SITE_URL'):
+    sitemaps = SitemapGenerator(
+        os.environ['SITEMAP_DIR'], lambda: db, os.environ['SITE_URL'],
+        urls_per_file=int(os.environ.get('SITEMAP_URLS_PER_FILE', '10000')),
     )
-    updated = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0})
-    return SiteSettings(**updated)
+    revision_log.on_commit.append(sitemaps.content_changed)
+
+# ----- Batch Route -----
+MAX_BATCH_REQUESTS = 25
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# Streams and nested batches cannot be answered inside a batch
+BATCH_EXCLUDED_PATHS = {"/api/batch", "/api/events"}
+BATCH_FORWARDED_HEADERS = {b"x-admin-token", b"authorization", b"accept-language"}
+# Connection-level scope keys a sub-request shares with the batch; everything the app adds is rebuilt
+BATCH_SCOPE_KEYS = {"type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state"}
+
+async def dispatch_subrequest(parent: Request, item: BatchItem) -> dict:
+    """Run one sub-request through the whole ASGI app in-process and capture its response.
+
+    It passes through every middleware like a request of its own (its own
+    Server-Timing header and slow-request log included), so middleware-level
+    controls apply to each sub-request and cannot be bypassed with a batch.
+    """
+    path, _, query_string = item.path.partition("?")
+    method = item.method.upper()
+    if method not in BATCH_METHODS:
+        return {"status": 400, "headers": {}, "body": {"detail": f"Unsupported method {item.method}"}}
+    if not path.startswith("/api/") or path.rstrip("/") in BATCH_EXCLUDED_PATHS:
+        return {"status": 400, "headers": {}, "body": {"detail": "Path not allowed in a batch"}}
+    if item.query:
+        query_string = "&".join(filter(None, [query_string, urlencode(item.query, doseq=True)]))
+
+    body = b"" if item.body is None else json.dumps(item.body).encode()
+    # Header names are case-insensitive: the item's own headers replace the forwarded and default ones
+    headers = {k: v for k, v in parent.scope["headers"] if k in BATCH_FORWARDED_HEADERS}
+    headers[b"content-type"] = b"application/json"
+    headers.update((k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (item.headers or {}).items())
+    headers[b"content-length"] = str(len(body)).encode()
+    scope = {**{k: v for k, v in parent.scope.items() if k in BATCH_SCOPE_KEYS}, "method": method, "path": path,
+             "raw_path": path.encode(), "query_string": query_string.encode("latin-1"),
+             "headers": list(headers.items())}
+
+    request_sent = False
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = {"status": 500, "headers": {}}
+    chunks = []
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode("latin-1"): v.decode("latin-1") for k, v in message.get("headers", [])
+                                   if k != b"content-length"}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        logger.error(f"Batch sub-request {method} {path} failed: {e}")
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    content = b"".join(chunks)
+    if response["headers"].get("content-type", "").startswith("application/json"):
+        response["body"] = json.loads(content) if content else None
+    else:
+        response["body"] = content.decode("utf-8", errors="replace")
+    return response
+
+@api_router.post("/batch")
+async def batch_requests(batch: BatchRequest, request: Request):
+    """Run several API calls in one round trip.
+
+    Sub-requests run in-process through the full middleware stack and run
+    concurrently, so order them across batches when one depends on another.
+    Each result has the sub-request's own status, headers and body; the batch
+    itself only fails when it is malformed.
+    """
+    if len(batch.requests) > MAX_BATCH_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REQUESTS} requests per batch")
+    results = await asyncio.gather(*(dispatch_subrequest(request, item) for item in batch.requests))
+    return {"responses": [{"index": index, **result} for index, result in enumerate(results)]}
 
 # ----- Seed Data Route -----
 @api_router.post("/seed-data")
 async def seed_data_endpoint():
-    """Seed/Reset database with default data"""
+    """Seed/Reset database with default data (only changed documents are written)"""
     try:
-        # Import the do_seed_data function (defined later in the file)
-        # We need to use inline import logic here
-        import sys
-        import os
-        
-        # Ensure the backend directory is in the path
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        if backend_dir not in sys.path:
-            sys.path.insert(0, backend_dir)
-        
-        # Import seed_data
-        from seed_data import categories, products, hero_slides, testimonials, gift_boxes, site_settings
-        
-        # Clear existing data from all collections
-        await db.categories.delete_many({})
-        await db.products.delete_many({})
-        await db.hero_slides.delete_many({})
-        await db.testimonials.delete_many({})
-        await db.gift_boxes.delete_many({})
-        
-        # Insert fresh categories
-        if categories:
-            await db.categories.insert_many([dict(c) for c in categories])
-        
-        # Insert fresh products
-        if products:
-            await db.products.insert_many([dict(p) for p in products])
-        
-        # Insert fresh hero slides
-        if hero_slides:
-            await db.hero_slides.insert_many([dict(h) for h in hero_slides])
-        
-        # Insert fresh testimonials
-        if testimonials:
-            await db.testimonials.insert_many([dict(t) for t in testimonials])
-        
-        # Insert fresh gift boxes
-        if gift_boxes:
-            await db.gift_boxes.insert_many([dict(g) for g in gift_boxes])
-        
-        # Update/insert site settings
-        await db.site_settings.update_one(
-            {"id": "site_settings"},
-            {"$set": dict(site_settings)},
-            upsert=True
-        )
-        
+        result = await do_seed_data()
         logging.info("Data seeded successfully via API")
-        
-        return {
-            "message": "Data seeded successfully", 
-            "categories": len(categories), 
-            "products": len(products),
-            "heroSlides": len(hero_slides),
-            "testimonials": len(testimonials),
-            "giftBoxes": len(gift_boxes)
-        }
-    except ImportError as e:
-        logging.error(f"Failed to import seed_data: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to import seed_data module: {str(e)}")
+        return {"message": "Data seeded successfully", **result}
     except Exception as e:
         logging.error(f"Seed data error: {e}")
         raise HTTPException(status_code=500, detail=f"Error seeding data: {str(e)}")
@@ -638,8 +1493,8 @@ async def upload_file(file: UploadFile = File(...)):
         file_path = UPLOAD_DIR / unique_filename
         content = await file.read()
         
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Write off the event loop so large uploads don't stall other requests
+        await asyncio.to_thread(file_path.write_bytes, content)
         
         # Return the URL path
         return {"url": f"/api/uploads/{unique_filename}", "filename": unique_filename}
@@ -654,7 +1509,7 @@ async def get_uploaded_file(filename: str):
     from starlette.responses import FileResponse
     
     file_path = UPLOAD_DIR / filename
-    if not file_path.exists():
+    if not await asyncio.to_thread(file_path.exists):
         raise HTTPException(status_code=404, detail="File not found")
     
     return FileResponse(file_path)
@@ -709,6 +1564,129 @@ async def delete_newsletter_subscription(sub_id: str):
     await db.newsletter.delete_one({"id": sub_id})
     return {"message": "Deleted"}
 
+# ============== ADMIN STATS ==============
+
+ADMIN_STATS_TTL = float(os.environ.get('ADMIN_STATS_TTL', '30'))
+STATS_COLLECTIONS = {
+    "products": "products",
+    "categories": "categories",
+    "heroSlides": "hero_slides",
+    "testimonials": "testimonials",
+    "giftBoxes": "gift_boxes",
+    "bulkOrders": "bulk_orders",
+    "newsletter": "newsletter",
+}
+admin_stats_cache = {}  # days -> (expires at, stats)
+
+async def daily_counts(collection, since: str, days: List[str], extra: Optional[dict] = None) -> dict:
+    """Documents created per day (createdAt is an ISO string, so its first 10 chars are the date)"""
+    facets = {"daily": [
+        {"$match": {"createdAt": {"$gte": since}}},
+        {"$group": {"_id": {"$substrCP": ["$createdAt", 0, 10]}, "count": {"$sum": 1}}},
+    ], **(extra or {})}
+    result = (await collection.aggregate([{"$facet": facets}]).to_list(1) or [{}])[0]
+    counts = {row["_id"]: row["count"] for row in result.get("daily", [])}
+    result["daily"] = [{"date": day, "count": counts.get(day, 0)} for day in days]
+    return result
+
+async def compute_admin_stats(days: int) -> dict:
+    today = datetime.now(timezone.utc).date()
+    day_list = [(today - timedelta(days=n)).isoformat() for n in range(days - 1, -1, -1)]
+    since = day_list[0]
+    counts, orders, signups = await asyncio.gather(
+        asyncio.gather(*(db[name].estimated_document_count() for name in STATS_COLLECTIONS.values())),
+        daily_counts(db.bulk_orders, since, day_list, {"status": [
+            {"$group": {"_id": {"$ifNull": ["$status", "new"]}, "count": {"$sum": 1}}},
+        ]}),
+        daily_counts(db.newsletter, since, day_list),
+    )
+    return {
+        "counts": dict(zip(STATS_COLLECTIONS, counts)),
+        "bulkOrdersPerDay": orders["daily"],
+        "bulkOrderStatus": {row["_id"]: row["count"] for row in orders.get("status", [])},
+        "newsletterPerDay": signups["daily"],
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+@api_router.get("/admin/stats")
+async def get_admin_stats(days: int = 30):
+    """Dashboard numbers in one small response, cached for ADMIN_STATS_TTL seconds"""
+    if not 1 <= days <= 365:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 365")
+    cached = admin_stats_cache.get(days)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    stats = await compute_admin_stats(days)
+    admin_stats_cache[days] = (time.monotonic() + ADMIN_STATS_TTL, stats)
+    return stats
+
+# ============== DIAGNOSTICS ==============
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard diagnostic endpoints with the ADMIN_API_TOKEN shared secret"""
+    expected = os.environ.get('ADMIN_API_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=403, detail="Diagnostics disabled: ADMIN_API_TOKEN is not configured")
+    if x_admin_token != expected:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@api_router.get("/admin/query-profile", dependencies=[Depends(require_admin)])
+async def get_query_profile():
+    """Query shapes seen since startup with latency percentiles and explain-sampled plans"""
+    return query_profiler.report()
+
+@api_router.delete("/admin/query-profile", dependencies=[Depends(require_admin)])
+async def reset_query_profile():
+    query_profiler.reset()
+    return {"message": "Query profile reset"}
+
+@api_router.get("/admin/event-loop", dependencies=[Depends(require_admin)])
+async def get_event_loop_stats():
+    """Event loop lag percentiles and, in debug mode, stacks of blocking callbacks"""
+    return loop_monitor.snapshot()
+
+@api_router.get("/admin/metrics", dependencies=[Depends(require_admin)])
+async def get_metrics():
+    """Runtime metrics in the Prometheus text format"""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(loop_monitor.prometheus())
+
+# On-demand profiling (one CPU profile at a time; memory snapshots kept in-process)
+cpu_profile_lock = asyncio.Lock()
+memory_profiler = MemoryProfiler()
+
+@api_router.get("/admin/profile/cpu", dependencies=[Depends(require_admin)])
+async def profile_cpu(seconds: float = 10, interval_ms: float = 10):
+    """Sample all thread stacks for a few seconds and return collapsed stacks (flamegraph input)"""
+    from starlette.responses import PlainTextResponse
+    
+    if not 0 < seconds <= 60 or not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="seconds must be in (0, 60] and interval_ms in [1, 1000]")
+    if cpu_profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A CPU profile is already running")
+    async with cpu_profile_lock:
+        stacks = await asyncio.to_thread(sample_cpu, seconds, interval_ms / 1000)
+    return PlainTextResponse(collapsed(stacks))
+
+@api_router.post("/admin/profile/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(top: int = 20):
+    """Take a tracemalloc snapshot (starting tracing on first use) and return top allocations"""
+    return await asyncio.to_thread(memory_profiler.take_snapshot, top)
+
+@api_router.get("/admin/profile/memory/diff", dependencies=[Depends(require_admin)])
+async def diff_memory_snapshots(base: str, target: Optional[str] = None, top: int = 20):
+    """Allocation growth between two snapshots (target defaults to the latest one)"""
+    ids = memory_profiler.snapshot_ids()
+    target = target or (ids[-1] if ids else None)
+    if base not in ids or target not in ids:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot; available: {ids}")
+    return await asyncio.to_thread(memory_profiler.diff, base, target, top)
+
+@api_router.delete("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def stop_memory_profiling():
+    memory_profiler.stop()
+    return {"message": "Memory tracing stopped"}
+
 # ============== THEME EXPORT ==============
 
 @api_router.get("/export-theme")
@@ -749,45 +1727,53 @@ async def export_theme():
         }
     )
 
+async def replace_content(collection, docs: List[dict], revision: int):
+    """Swap a collection's documents for ``docs``, tombstoning ids that disappear"""
+    old_ids = set(await collection.distinct("id"))
+    await collection.delete_many({})
+    await collection.insert_many([{**doc, "revision": revision} for doc in docs])
+    revision_log.changed(collection.name, None, revision)
+    await revision_log.tombstone(collection.name, list(old_ids - {doc.get("id") for doc in docs}), revision)
+
 @api_router.post("/import-theme")
 async def import_theme(import_data: dict):
     """Import theme data from JSON"""
     try:
-        # Import site settings
-        if "siteSettings" in import_data:
-            settings = import_data["siteSettings"]
-            settings["id"] = "site_settings"
-            await db.site_settings.replace_one(
-                {"id": "site_settings"},
-                settings,
-                upsert=True
-            )
-        
-        # Import categories
-        if "categories" in import_data and import_data["categories"]:
-            await db.categories.delete_many({})
-            await db.categories.insert_many(import_data["categories"])
-        
-        # Import products
-        if "products" in import_data and import_data["products"]:
-            await db.products.delete_many({})
-            await db.products.insert_many(import_data["products"])
-        
-        # Import hero slides
-        if "heroSlides" in import_data and import_data["heroSlides"]:
-            await db.hero_slides.delete_many({})
-            await db.hero_slides.insert_many(import_data["heroSlides"])
-        
-        # Import testimonials
-        if "testimonials" in import_data and import_data["testimonials"]:
-            await db.testimonials.delete_many({})
-            await db.testimonials.insert_many(import_data["testimonials"])
-        
-        # Import gift boxes
-        if "giftBoxes" in import_data and import_data["giftBoxes"]:
-            await db.gift_boxes.delete_many({})
-            await db.gift_boxes.insert_many(import_data["giftBoxes"])
-        
+        async with revision_log.allocate() as revision:
+            # Import site settings
+            if "siteSettings" in import_data:
+                settings = import_data["siteSettings"]
+                settings["id"] = "site_settings"
+                settings["revision"] = revision
+                await db.site_settings.replace_one(
+                    {"id": "site_settings"},
+                    settings,
+                    upsert=True
+                )
+                revision_log.changed("site_settings", ["site_settings"], revision)
+                site_settings_changed()
+
+            # Import categories
+            if "categories" in import_data and import_data["categories"]:
+                await replace_content(db.categories, import_data["categories"], revision)
+
+            # Import products
+            if "products" in import_data and import_data["products"]:
+                await replace_content(db.products, import_data["products"], revision)
+            catalog_cache.invalidate()
+
+            # Import hero slides
+            if "heroSlides" in import_data and import_data["heroSlides"]:
+                await replace_content(db.hero_slides, import_data["heroSlides"], revision)
+
+            # Import testimonials
+            if "testimonials" in import_data and import_data["testimonials"]:
+                await replace_content(db.testimonials, import_data["testimonials"], revision)
+
+            # Import gift boxes
+            if "giftBoxes" in import_data and import_data["giftBoxes"]:
+                await replace_content(db.gift_boxes, import_data["giftBoxes"], revision)
+
         return {"message": "Theme imported successfully", "success": True}
     except Exception as e:
         logging.error(f"Import error: {e}")
@@ -802,6 +1788,16 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "X-Missing-Ids"],
+)
+
+# Per-request phase timings: Server-Timing header + JSON log line for slow requests
+app.add_middleware(
+    ServerTimingMiddleware,
+    path_prefix="/api",
+    header_enabled=os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true',
+    slow_threshold_ms=float(os.environ.get('SLOW_REQUEST_MS', '500')),
+    exclude_paths=("/api/events",),
 )
 
 # Configure logging
@@ -813,7 +1809,6 @@ logger = logging.getLogger(__name__)
 
 async def wait_for_mongodb(max_retries=30, delay=2):
     """Wait for MongoDB to be ready"""
-    import asyncio
     for i in range(max_retries):
         try:
             await db.command("ping")
@@ -825,102 +1820,116 @@ async def wait_for_mongodb(max_retries=30, delay=2):
     logger.error("Failed to connect to MongoDB after all retries")
     return False
 
+async def sync_seed_collection(collection, docs: List[dict], key: str, prune: bool = True) -> dict:
+    """Upsert seed ``docs`` by their natural ``key`` in one unordered bulk_write.
+
+    Only documents whose fields differ are written, existing documents keep
+    their id, and with ``prune`` documents whose key is not in the seed are removed.
+    """
+    keys = [doc[key] for doc in docs]
+    existing = {doc[key]: doc for doc in await collection.find({key: {"$in": keys}}, {"_id": 0}).to_list(None)}
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    async with revision_log.allocate() as revision:
+        operations, written = [], []
+        for doc in docs:
+            current = existing.get(doc[key])
+            if current is None:
+                operations.append(UpdateOne({key: doc[key]}, {"$setOnInsert": {**doc, "revision": revision}}, upsert=True))
+                written.append(doc["id"])
+                counts["inserted"] += 1
+                continue
+            changed = {k: v for k, v in doc.items() if k != "id" and current.get(k) != v}
+            if changed:
+                operations.append(UpdateOne({key: doc[key]}, {"$set": {**changed, "revision": revision},
+                                                              "$inc": {"version": 1}}))
+                written.append(current["id"])
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+        pruned = []
+        if prune:
+            pruned = [d["id"] for d in await collection.find({key: {"$nin": keys}}, {"_id": 0, "id": 1}).to_list(None)]
+            if pruned:
+                operations.append(DeleteMany({"id": {"$in": pruned}}))
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            counts["deleted"] = result.deleted_count
+            revision_log.changed(collection.name, written, revision)
+            await revision_log.tombstone(collection.name, pruned, revision)
+    return counts
+
 async def do_seed_data():
-    """Perform the actual seeding"""
-    try:
-        # Import seed data from the same directory
-        import sys
-        import os
-        
-        # Ensure the backend directory is in the path
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        if backend_dir not in sys.path:
-            sys.path.insert(0, backend_dir)
-        
-        # Now import seed_data
-        from seed_data import categories, products, hero_slides, testimonials, gift_boxes, site_settings
-        
-        # Clear existing data
-        await db.categories.delete_many({})
-        await db.products.delete_many({})
-        await db.hero_slides.delete_many({})
-        await db.testimonials.delete_many({})
-        await db.gift_boxes.delete_many({})
-        
-        # Insert categories
-        if categories:
-            await db.categories.insert_many([dict(c) for c in categories])
-            logger.info(f"Seeded {len(categories)} categories")
-        
-        # Insert products
-        if products:
-            await db.products.insert_many([dict(p) for p in products])
-            logger.info(f"Seeded {len(products)} products")
-        
-        # Insert hero slides
-        if hero_slides:
-            await db.hero_slides.insert_many([dict(h) for h in hero_slides])
-            logger.info(f"Seeded {len(hero_slides)} hero slides")
-        
-        # Insert testimonials
-        if testimonials:
-            await db.testimonials.insert_many([dict(t) for t in testimonials])
-            logger.info(f"Seeded {len(testimonials)} testimonials")
-        
-        # Insert gift boxes
-        if gift_boxes:
-            await db.gift_boxes.insert_many([dict(g) for g in gift_boxes])
-            logger.info(f"Seeded {len(gift_boxes)} gift boxes")
-        
-        # Insert site settings
-        await db.site_settings.update_one(
-            {"id": "site_settings"},
-            {"$set": dict(site_settings)},
-            upsert=True
-        )
-        logger.info("Seeded site settings")
-        
-        return {
-            "categories": len(categories),
-            "products": len(products),
-            "heroSlides": len(hero_slides),
-            "testimonials": len(testimonials),
-            "giftBoxes": len(gift_boxes)
-        }
-    except ImportError as e:
-        logger.error(f"Failed to import seed_data module: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Error during seeding: {e}")
-        raise
+    """Bring the content collections in line with seed_data, all collections concurrently"""
+    collections = {
+        "categories": seed_data.categories,
+        "products": seed_data.products,
+        "hero_slides": seed_data.hero_slides,
+        "testimonials": seed_data.testimonials,
+        "gift_boxes": seed_data.gift_boxes,
+    }
+    results = await asyncio.gather(
+        *(sync_seed_collection(db[name], docs, seed_data.NATURAL_KEYS[name]) for name, docs in collections.items()),
+        sync_seed_collection(db.site_settings, [seed_data.site_settings], "id", prune=False),
+    )
+    changes = dict(zip(list(collections) + ["site_settings"], results))
+    catalog_cache.invalidate()
+    site_settings_changed()
+    admin_stats_cache.clear()
+    for name, counts in changes.items():
+        logger.info(f"Seeded {name}: {counts}")
+    
+    return {
+        "categories": len(seed_data.categories),
+        "products": len(seed_data.products),
+        "heroSlides": len(seed_data.hero_slides),
+        "testimonials": len(seed_data.testimonials),
+        "giftBoxes": len(seed_data.gift_boxes),
+        "changes": changes
+    }
 
 @app.on_event("startup")
 async def startup_db_client():
     """Auto-seed database with default data if empty"""
     try:
+        # Explain newly seen query shapes in the background
+        query_profiler.start(client)
+        loop_monitor.start()
+
         # Wait for MongoDB to be ready
         if not await wait_for_mongodb():
             logger.error("Cannot auto-seed: MongoDB not available")
             return
+
+        # /api/sync looks documents and tombstones up by revision; sitemap shards are product id ranges
+        await asyncio.gather(
+            *(db[name].create_index("revision") for name in SYNC_COLLECTIONS.values()),
+            db.tombstones.create_index("revision"),
+            db.products.create_index("id"),
+        )
         
         # Check if data already exists
         existing_products = await db.products.count_documents({})
+        existing_categories = await db.categories.count_documents({})
         if existing_products > 0:
             logger.info(f"Database already has {existing_products} products, skipping auto-seed")
-            return
-        
-        existing_categories = await db.categories.count_documents({})
-        if existing_categories > 0:
+        elif existing_categories > 0:
             logger.info(f"Database already has {existing_categories} categories, skipping auto-seed")
-            return
-        
-        logger.info("Database is empty, auto-seeding with default data...")
-        result = await do_seed_data()
-        logger.info(f"Auto-seed completed successfully! {result}")
+        else:
+            logger.info("Database is empty, auto-seeding with default data...")
+            result = await do_seed_data()
+            logger.info(f"Auto-seed completed successfully! {result}")
+
+        await catalog_cache.load()
+        if publisher is not None:
+            publisher.schedule()
+        if sitemaps is not None:
+            sitemaps.schedule()
         
     except Exception as e:
         logger.error(f"Auto-seed error: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await query_profiler.stop()
+    await loop_monitor.stop()
     client.close()
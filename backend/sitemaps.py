@@ -0,0 +1,225 @@
+# sitemap.xml and merchant product feed, regenerated incrementally from MongoDB cursors
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+from bisect import bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Set
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+STATIC_PAGES = ["/", "/products", "/bulk-order", "/about", "/career"]
+CURRENCY = "INR"
+INDEX = "sitemap.xml"
+FEED = "products-feed.xml.gz"
+CHUNK = 1000  # documents per write to the gzip stream
+
+PRODUCT_FIELDS = {"_id": 0, "id": 1, "slug": 1, "name": 1, "category": 1, "basePrice": 1, "image": 1, "images": 1,
+                  "sku": 1, "shortDescription": 1, "description": 1}
+
+
+def shard_bounds(shards: int) -> List[str]:
+    """Lower id bound of shards 1..n-1; ids are uuids, so even hex ranges give even shards"""
+    return [format(k * 16 ** 8 // shards, "08x") for k in range(1, shards)]
+
+
+def shard_of(product_id: str, bounds: List[str]) -> int:
+    return bisect_right(bounds, product_id)
+
+
+def shard_query(shard: int, bounds: List[str]) -> dict:
+    query = {}
+    if shard > 0:
+        query["$gte"] = bounds[shard - 1]
+    if shard < len(bounds):
+        query["$lt"] = bounds[shard]
+    return {"id": query} if query else {}
+
+
+def _url(loc: str) -> str:
+    return f"<url><loc>{escape(loc)}</loc></url>\n"
+
+
+class _GzipWriter:
+    """Streams text into ``path`` (gzip) through a temporary file; ``commit`` swaps it in atomically"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self.file = gzip.GzipFile(self.tmp, "wb", compresslevel=9, mtime=0)
+
+    async def write(self, text: str):
+        await asyncio.to_thread(self.file.write, text.encode())
+
+    async def commit(self):
+        await asyncio.to_thread(self.file.close)
+        os.replace(self.tmp, self.path)
+
+
+class SitemapGenerator:
+    """Sitemap index, gzip sitemaps and a merchant RSS feed under ``root`` for nginx to serve.
+
+    Products are split into id-range shards of about ``urls_per_file``. Each
+    shard has its own sitemap file and feed fragment, written in one cursor
+    pass, so a product change only rewrites its shard. The feed is the
+    concatenation of the fragments as gzip members, which is itself a valid
+    gzip file, so assembling it needs no database access or recompression.
+    The shard count only changes (with a full rebuild) when the catalog grows
+    past ``urls_per_file`` per shard on average or shrinks to a quarter of it;
+    the first run after startup is always a full rebuild.
+    """
+
+    def __init__(self, root, db_getter, site_url: str, urls_per_file: int = 10000, delay: float = 5.0):
+        self.root = Path(root)
+        self._db = db_getter
+        self.site_url = site_url.rstrip("/")
+        self.urls_per_file = urls_per_file
+        self.delay = delay
+        self._dirty_ids: Set[str] = set()
+        self._full = True
+        self._task: Optional[asyncio.Task] = None
+        self.shards = 0
+        self._lastmod = {}  # file name -> ISO time it was last written
+
+    def content_changed(self, collection: str, ids: Optional[List[str]], deleted: bool, revision: int):
+        """RevisionLog.on_commit listener"""
+        if collection == "products" and ids is not None:
+            self._dirty_ids.update(ids)
+        elif collection in ("products", "categories", "site_settings"):
+            self._full = True  # category names and the brand appear in every feed item
+        else:
+            return
+        self.schedule()
+
+    def schedule(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._full or self._dirty_ids:
+            await asyncio.sleep(self.delay)
+            try:
+                await self.generate()
+            except Exception as e:
+                logger.error(f"Sitemap generation failed: {e}")
+                self._full = True  # retried on the next change
+                return
+
+    def _shard_count(self, products: int) -> int:
+        current = self.shards
+        if current and self.urls_per_file // 4 * current <= products <= self.urls_per_file * current:
+            return current
+        return max(1, -(-products // self.urls_per_file))
+
+    async def generate(self):
+        """Rewrite the shards of changed products (everything after a full invalidation) and the index"""
+        await asyncio.to_thread((self.root / ".feed").mkdir, parents=True, exist_ok=True)
+        shards = self._shard_count(await self._db().products.estimated_document_count())
+        full = self._full or shards != self.shards
+        bounds = shard_bounds(shards)
+        dirty = set(range(shards)) if full else {shard_of(i, bounds) for i in self._dirty_ids}
+        self._full, self._dirty_ids = False, set()
+        self.shards = shards
+
+        db = self._db()
+        categories = {c["slug"]: c.get("name", "") async for c in db.categories.find({}, {"_id": 0, "slug": 1, "name": 1})}
+        settings = await db.site_settings.find_one({"id": "site_settings"}, {"_id": 0, "businessName": 1})
+        brand = (settings or {}).get("businessName", "")
+        if full:
+            await self._write_pages(categories)
+        for shard in sorted(dirty):
+            await self._write_shard(shard, bounds, categories, brand)
+        await self._write_feed(shards)
+        await asyncio.to_thread(self._write_index, shards)
+        logger.info(f"Sitemaps regenerated ({'all' if full else len(dirty)} of {shards} product shards)")
+
+    def _touch(self, name: str):
+        self._lastmod[name] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    async def _write_pages(self, categories: dict):
+        name = "sitemap-pages.xml.gz"
+        writer = _GzipWriter(self.root / name)
+        await writer.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n')
+        await writer.write("".join(_url(self.site_url + page) for page in STATIC_PAGES))
+        await writer.write("".join(_url(f"{self.site_url}/products?category={slug}") for slug in categories))
+        await writer.write("</urlset>\n")
+        await writer.commit()
+        self._touch(name)
+
+    def _feed_item(self, product: dict, categories: dict, brand: str) -> str:
+        images = [i for i in product.get("images") or [] if i and i != product.get("image")][:10]
+        fields = [
+            ("g:id", product["id"]),
+            ("g:title", product.get("name", "")),
+            ("g:description", (product.get("shortDescription") or product.get("description") or "")[:5000]),
+            ("g:link", f"{self.site_url}/product/{product.get('slug', '')}"),
+            ("g:image_link", product.get("image", "")),
+            *(("g:additional_image_link", image) for image in images),
+            ("g:price", f"{float(product.get('basePrice') or 0):.2f} {CURRENCY}"),
+            ("g:availability", "in_stock"),
+            ("g:condition", "new"),
+            ("g:brand", brand),
+            ("g:mpn", product.get("sku", "")),
+            ("g:product_type", categories.get(product.get("category"), product.get("category", ""))),
+        ]
+        return "<item>" + "".join(f"<{tag}>{escape(str(value))}</{tag}>" for tag, value in fields if value) + "</item>\n"
+
+    async def _write_shard(self, shard: int, bounds: List[str], categories: dict, brand: str):
+        name = f"sitemap-products-{shard}.xml.gz"
+        sitemap = _GzipWriter(self.root / name)
+        feed = _GzipWriter(self.root / ".feed" / f"{shard}.gz")
+        await sitemap.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n')
+        urls, items = [], []
+        cursor = self._db().products.find(shard_query(shard, bounds), PRODUCT_FIELDS).sort("id", 1)
+        async for product in cursor:
+            urls.append(_url(f"{self.site_url}/product/{product.get('slug', '')}"))
+            items.append(self._feed_item(product, categories, brand))
+            if len(urls) >= CHUNK:
+                await sitemap.write("".join(urls))
+                await feed.write("".join(items))
+                urls, items = [], []
+        await sitemap.write("".join(urls) + "</urlset>\n")
+        await feed.write("".join(items))
+        await sitemap.commit()
+        await feed.commit()
+        self._touch(name)
+
+    async def _write_feed(self, shards: int):
+        head = (f'<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n'
+                f"<channel><title>{escape(self.site_url)}</title><link>{escape(self.site_url)}</link>"
+                f"<description>Product feed</description>\n")
+        tail = "</channel></rss>\n"
+
+        def assemble():
+            tmp = self.root / f".{FEED}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as out:
+                out.write(gzip.compress(head.encode(), mtime=0))
+                for shard in range(shards):
+                    with open(self.root / ".feed" / f"{shard}.gz", "rb") as fragment:
+                        shutil.copyfileobj(fragment, out)
+                out.write(gzip.compress(tail.encode(), mtime=0))
+            os.replace(tmp, self.root / FEED)
+
+        await asyncio.to_thread(assemble)
+
+    def _write_index(self, shards: int):
+        names = ["sitemap-pages.xml.gz", *(f"sitemap-products-{k}.xml.gz" for k in range(shards))]
+        for stale in self.root.glob("sitemap-products-*.xml.gz"):
+            if stale.name not in names:
+                stale.unlink()
+        for stale in (self.root / ".feed").glob("*.gz"):
+            if int(stale.stem) >= shards:
+                stale.unlink()
+        entries = "".join(
+            f"<sitemap><loc>{escape(f'{self.site_url}/{name}')}</loc><lastmod>{self._lastmod[name]}</lastmod></sitemap>\n"
+            for name in names
+        )
+        data = f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n{entries}</sitemapindex>\n'
+        tmp = self.root / f".{INDEX}.{os.getpid()}.tmp"
+        tmp.write_bytes(data.encode())
+        os.replace(tmp, self.root / INDEX)
@@ -0,0 +1,81 @@
+# Compiles SiteSettings.theme / pageStyles into a minified stylesheet of CSS custom properties
+import hashlib
+import re
+from typing import Dict, Optional
+
+# theme section -> (theme key, CSS variable); "colors" maps every key to --color-<key>
+THEME_VARIABLES = {
+    "typography": [("fontFamily", "font-family"), ("headingFont", "heading-font"), ("baseFontSize", "base-font-size"),
+                   ("h1Size", "h1-size"), ("h2Size", "h2-size"), ("h3Size", "h3-size")],
+    "header": [("background", "header-bg"), ("text", "header-text"), ("navText", "header-nav-text"),
+               ("navHover", "header-nav-hover")],
+    "footer": [("background", "footer-bg"), ("text", "footer-text"), ("linkColor", "footer-link")],
+    "buttons": [("primaryBg", "btn-primary-bg"), ("primaryText", "btn-primary-text"),
+                ("primaryHover", "btn-primary-hover"), ("secondaryBg", "btn-secondary-bg"),
+                ("secondaryText", "btn-secondary-text"), ("secondaryHover", "btn-secondary-hover"),
+                ("borderRadius", "btn-radius")],
+    "cards": [("background", "card-bg"), ("border", "card-border"), ("shadow", "card-shadow"),
+              ("borderRadius", "card-radius")],
+}
+# pageStyles.global key -> CSS variable (other pages map every key to --<page>-<key>)
+GLOBAL_PAGE_VARIABLES = {
+    "headerBg": "header-bg", "headerText": "header-text", "headerNavHover": "header-nav-hover",
+    "footerBg": "footer-bg", "footerText": "footer-text", "footerLink": "footer-link",
+    "primaryColor": "color-primary", "accentColor": "color-accent", "accentHover": "color-accentHover",
+    "textColor": "color-text", "textLight": "color-textLight", "backgroundColor": "color-background",
+    "cardBg": "card-bg", "cardBorder": "card-border", "buttonRadius": "btn-radius",
+}
+
+_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+_UNSAFE = re.compile(r"[;{}<>\n\r]|/\*")
+
+
+def _value(value) -> Optional[str]:
+    """CSS-safe text for a setting; None for missing values and anything that could escape the declaration"""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    text = str(value).strip()
+    return text if text and not _UNSAFE.search(text) else None
+
+
+def _section(value) -> dict:
+    """Settings are free-form JSON: anything but an object contributes nothing"""
+    return value if isinstance(value, dict) else {}
+
+
+def css_variables(theme: Optional[dict], page_styles: Optional[dict]) -> Dict[str, str]:
+    """Custom properties in the order the storefront applied them: theme, then pageStyles (later wins)"""
+    variables = {}
+
+    def put(name, value):
+        value = _value(value)
+        if value is not None and _NAME.match(name):
+            variables.pop(name, None)  # keep the order of the declaration that wins
+            variables[name] = value
+
+    theme = _section(theme)
+    for key, value in _section(theme.get("colors")).items():
+        put(f"color-{key}", value)
+    for section, mapping in THEME_VARIABLES.items():
+        values = _section(theme.get(section))
+        for key, name in mapping:
+            put(name, values.get(key))
+
+    page_styles = _section(page_styles)
+    global_styles = _section(page_styles.get("global"))
+    for key, name in GLOBAL_PAGE_VARIABLES.items():
+        put(name, global_styles.get(key))
+    for page, styles in page_styles.items():
+        if page != "global" and isinstance(styles, dict):
+            for key, value in styles.items():
+                put(f"{page}-{key}", value)
+    return variables
+
+
+def compile_css(theme: Optional[dict], page_styles: Optional[dict]) -> str:
+    declarations = ";".join(f"--{name}:{value}" for name, value in css_variables(theme, page_styles).items())
+    return f":root{{{declarations}}}"
+
+
+def content_hash(css: str) -> str:
+    return hashlib.sha256(css.encode()).hexdigest()[:16]
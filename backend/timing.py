@@ -0,0 +1,165 @@
+# Per-request phase timings for the DryFruto API (Server-Timing header + slow request log)
+import asyncio
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Phase durations (in seconds) collected while serving one request"""
+
+    __slots__ = ("started", "db", "endpoint", "handler", "serialize")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Appended to from Motor's executor threads, summed when the request ends
+        self.db: List[float] = []
+        self.endpoint = 0.0
+        self.handler = 0.0
+        self.serialize = 0.0
+
+    def phases(self, total: float) -> dict:
+        db = sum(self.db)
+        return {
+            "db": db,
+            "app": max(self.endpoint - db, 0.0),
+            "validate": max(self.handler - self.endpoint - self.serialize, 0.0),
+            "serialize": self.serialize,
+            "total": total,
+        }
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class DBTimingListener(monitoring.CommandListener):
+    """Attributes MongoDB command durations to the request that issued them.
+
+    Motor runs pymongo calls on an executor with a copy of the caller's context,
+    so the request's RequestTimings is visible from the listener callbacks.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timings = _current.get()
+        if timings is not None:
+            timings.db.append(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records how long rendering the body took"""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        timings = _current.get()
+        if timings is not None:
+            timings.serialize += time.perf_counter() - start
+        return body
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that splits handler time into endpoint and validation phases.
+
+    Everything FastAPI does around the endpoint call (request parsing,
+    response_model validation, jsonable_encoder) is reported as "validate".
+    """
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "_timed", False):
+            async def timed_endpoint(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    timings = _current.get()
+                    if timings is not None:
+                        timings.endpoint += time.perf_counter() - start
+
+            timed_endpoint._timed = True
+            self.dependant.call = timed_endpoint
+
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timings = _current.get()
+                if timings is not None:
+                    timings.handler += time.perf_counter() - start
+
+        return timed_handler
+
+
+def format_server_timing(phases: dict) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items())
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware that times every request under ``path_prefix``.
+
+    Adds a ``Server-Timing`` header when ``header_enabled`` is set and logs a
+    JSON line for requests slower than ``slow_threshold_ms``. Long-lived
+    streams listed in ``exclude_paths`` are passed through untimed.
+    """
+
+    def __init__(self, app, path_prefix: str = "/api", header_enabled: bool = True,
+                 slow_threshold_ms: float = 500.0, exclude_paths: tuple = ()):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.exclude_paths = frozenset(exclude_paths)
+        self.header_enabled = header_enabled
+        self.slow_threshold_ms = slow_threshold_ms
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not scope["path"].startswith(self.path_prefix)
+                or scope["path"] in self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.header_enabled:
+                    total = time.perf_counter() - timings.started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", format_server_timing(timings.phases(total)).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - timings.started
+            if total * 1000 >= self.slow_threshold_ms:
+                phases = timings.phases(total)
+                logger.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status_code,
+                    **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in phases.items()},
+                }))
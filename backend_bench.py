@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for DryFruto Backend hot paths
+Measures ops/s and allocated bytes per op for model construction, update-dict
+building, response serialization, status-check timestamp parsing and cart quotes over
+small/medium/large catalog fixtures, and compares them against a stored baseline.
+
+Usage:
+    python backend_bench.py                      # run and compare with bench_baseline.json
+    python backend_bench.py --save-baseline      # record a new baseline on this machine
+    python backend_bench.py --size small --filter product --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+# server.py reads these at import time; the Motor client never connects during benchmarks
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1")
+os.environ.setdefault("DB_NAME", "dryfruto_bench")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+import catalog_generator  # noqa: E402
+import pricing  # noqa: E402
+import server  # noqa: E402
+from timing import TimedJSONResponse  # noqa: E402
+
+BASELINE_FILE = ROOT_DIR / "bench_baseline.json"
+
+CATALOG_SIZES = {"small": 12, "medium": 1000, "large": 10000}
+
+
+def catalog(size: int) -> List[dict]:
+    """Deterministic catalog of ``size`` product documents expanded from the seed products"""
+    return list(catalog_generator.generate_products(size))
+
+
+def status_checks(size: int) -> List[dict]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [{"id": f"check-{i}", "client_name": f"client-{i % 7}",
+             "timestamp": (start + timedelta(minutes=i)).isoformat()} for i in range(size)]
+
+
+def build_benchmarks(size: int) -> dict:
+    """name -> zero-argument callable; fixtures are built once outside the timed region"""
+    products = catalog(size)
+    settings_doc = server.SiteSettings().model_dump()
+    product_list = TypeAdapter(List[server.Product])
+    product_objects = [server.Product(**p) for p in products]
+    product_updates = [server.ProductUpdate(basePrice=p["basePrice"] + 1, priceVariants=p["priceVariants"])
+                       for p in products]
+    settings_update = server.SiteSettingsUpdate(theme=settings_doc["theme"], phone="9999999999")
+    checks = status_checks(size)
+    validated = product_list.validate_python(products)
+    encoded = product_list.dump_python(validated, mode="json")
+    products_by_id = {p["id"]: p for p in products}
+    quote_lines = [{"productId": p["id"], "variant": "500g", "quantity": 2} for p in products[:20]]
+    tiers = settings_doc["bulkPricingTiers"]
+
+    return {
+        "product_construct": lambda: [server.Product(**p) for p in products],
+        "site_settings_construct": lambda: server.SiteSettings(**settings_doc),
+        "product_update_fields": lambda: [server.update_fields(u) for u in product_updates],
+        "site_settings_update_fields": lambda: server.update_fields(settings_update),
+        "product_list_response_model": lambda: product_list.dump_python(product_list.validate_python(products), mode="json"),
+        "product_list_jsonable_encoder": lambda: jsonable_encoder(product_objects),
+        "product_list_render": lambda: TimedJSONResponse(encoded),
+        "status_check_parse": lambda: server.parse_status_check_timestamps([dict(c) for c in checks]),
+        "cart_quote": lambda: pricing.quote(quote_lines, products_by_id, tiers),
+    }
+
+
+def measure(fn, min_time: float = 0.2, repeats: int = 5) -> dict:
+    """Best-of-``repeats`` ops/s and peak bytes allocated by one call"""
+    fn()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time / repeats:
+            break
+        loops *= 2
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"opsPerSec": round(1 / best, 2), "usPerOp": round(best * 1e6, 3), "peakAllocBytes": peak}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond ``tolerance`` (fraction) in throughput or allocations"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["opsPerSec"] < base["opsPerSec"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['opsPerSec']} ops/s vs baseline {base['opsPerSec']}")
+        if result["peakAllocBytes"] > base["peakAllocBytes"] * (1 + tolerance):
+            regressions.append(f"{name}: {result['peakAllocBytes']} B/op vs baseline {base['peakAllocBytes']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the DryFruto backend")
+    parser.add_argument("--size", action="append", choices=sorted(CATALOG_SIZES),
+                        help="Catalog fixture(s) to run (default: all)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Approximate seconds spent per benchmark")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction (default 0.2)")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for size_name in args.size or list(CATALOG_SIZES):
+        for name, fn in build_benchmarks(CATALOG_SIZES[size_name]).items():
+            if args.filter in name:
+                key = f"{name}[{size_name}]"
+                results[key] = measure(fn, min_time=args.min_time)
+                print(f"{key:45s} {results[key]['opsPerSec']:>14,.1f} ops/s "
+                      f"{results[key]['peakAllocBytes']:>14,d} B/op", file=sys.stderr)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Baseline saved to {baseline_path}", file=sys.stderr)
+        return
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline first", file=sys.stderr)
+        return
+
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
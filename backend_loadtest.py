@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Load Tests for DryFruto Backend API
+Starts server:app against a local MongoDB (or an in-memory stand-in), loads a
+synthetic catalog with catalog_generator and drives storefront/admin traffic,
+reporting req/s and latency percentiles per endpoint as JSON.
+
+Usage:
+    python backend_loadtest.py --products 2000 --duration 30 --concurrency 16 --mix mixed
+    python backend_loadtest.py --mongo-url mongodb://localhost:27017 --output result.json
+    python backend_loadtest.py --base-url http://localhost:8001   # existing server and data, nothing loaded
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import requests
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "backend"
+LOADTEST_DB = "dryfruto_loadtest"
+
+sys.path.insert(0, str(BACKEND_DIR))
+import catalog_generator  # noqa: E402
+
+# Smallest valid PNG, used for upload traffic
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+# Weighted scenario mixes: scenario name -> weight
+MIXES = {
+    "storefront": {"bootstrap": 30, "product_page": 60, "newsletter": 5, "bulk_order": 5},
+    "admin": {"admin_dashboard": 30, "product_update": 30, "upload": 20, "submissions": 20},
+    "mixed": {"bootstrap": 25, "product_page": 50, "newsletter": 3, "bulk_order": 5,
+              "admin_dashboard": 5, "product_update": 5, "upload": 3, "submissions": 4},
+}
+
+BOOTSTRAP_PATHS = ["/categories", "/products", "/hero-slides", "/testimonials", "/gift-boxes", "/site-settings"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def load_catalog(db, products: int, seed: int) -> dict:
+    """Replace the catalog with ``products`` synthetic products (bulk inserts, no API calls)"""
+    return await catalog_generator.load_catalog(db, products, seed=seed, drop=True)
+
+
+async def load_catalog_into(mongo_url: str, products: int, seed: int) -> dict:
+    client = AsyncIOMotorClient(mongo_url)
+    try:
+        return await load_catalog(client[LOADTEST_DB], products, seed)
+    finally:
+        client.close()
+
+
+class ServerProcess:
+    """uvicorn server:app (and optionally mongod) running in child processes.
+
+    With ``products`` the catalog is loaded before the server starts, so its
+    caches and indexes are built from the synthetic data.
+    """
+
+    def __init__(self, mongo_url=None, mongod=None, in_memory=False, products=0, seed=42):
+        self.mongo_url = mongo_url
+        self.mongod = mongod
+        self.in_memory = in_memory
+        self.products = products
+        self.seed = seed
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}/api"
+        self._processes = []
+        self._dbpath = None
+
+    def start(self):
+        if self.mongod:
+            self._dbpath = tempfile.mkdtemp(prefix="dryfruto-loadtest-")
+            mongo_port = free_port()
+            self._processes.append(subprocess.Popen(
+                [self.mongod, "--dbpath", self._dbpath, "--port", str(mongo_port), "--bind_ip", "127.0.0.1", "--quiet"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+            self.mongo_url = f"mongodb://127.0.0.1:{mongo_port}"
+        if self.products and not self.in_memory:
+            asyncio.run(load_catalog_into(self.mongo_url, self.products, self.seed))
+
+        env = {**os.environ, "MONGO_URL": self.mongo_url or "mongodb://127.0.0.1:1", "DB_NAME": LOADTEST_DB,
+               "SLOW_REQUEST_MS": os.environ.get("SLOW_REQUEST_MS", "1000000")}
+        if self.in_memory:
+            command = [sys.executable, str(Path(__file__).resolve()), "--serve-in-memory", str(self.port),
+                       "--products", str(self.products), "--seed", str(self.seed)]
+        else:
+            command = [sys.executable, "-m", "uvicorn", "server:app", "--port", str(self.port), "--log-level", "warning"]
+        self._processes.append(subprocess.Popen(command, cwd=BACKEND_DIR, env=env))
+
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                if requests.get(f"{self.base_url}/health", timeout=1).json().get("status") == "healthy":
+                    return
+            except (requests.exceptions.RequestException, ValueError):
+                pass
+            time.sleep(0.5)
+        self.stop()
+        raise RuntimeError("Backend did not become healthy within 60s")
+
+    def stop(self):
+        for process in reversed(self._processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes = []
+        if self._dbpath:
+            shutil.rmtree(self._dbpath, ignore_errors=True)
+
+
+def serve_in_memory(port: int, products: int, seed: int):
+    """Run server:app with its Motor client swapped for mongomock-motor"""
+    import uvicorn
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[LOADTEST_DB]
+    if products:
+        asyncio.run(load_catalog(server.db, products, seed))
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+class LoadTester:
+    def __init__(self, base_url: str, mix: str, concurrency: int, rng_seed: int, mongo_url=None):
+        self.base_url = base_url
+        self.mongo_url = mongo_url
+        self.mix = MIXES[mix]
+        self.concurrency = concurrency
+        self.rng_seed = rng_seed
+        self.product_ids = []
+        self.uploaded_files = []
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._recording = False
+
+    # ----- setup -----
+    def load_product_ids(self):
+        """Every product id, from MongoDB when reachable, else from the full /sync snapshot.
+
+        GET /products stops at 1000 documents, so it would miss most of a large catalog.
+        """
+        if self.mongo_url:
+            client = MongoClient(self.mongo_url)
+            try:
+                self.product_ids = [p["id"] for p in client[LOADTEST_DB].products.find({}, {"_id": 0, "id": 1})]
+            finally:
+                client.close()
+        else:
+            response = requests.get(f"{self.base_url}/sync", timeout=300)
+            response.raise_for_status()
+            self.product_ids = [p["id"] for p in response.json()["changes"].get("products", [])]
+        if not self.product_ids:
+            raise RuntimeError("No products available to drive product-page traffic")
+
+    # ----- request helpers -----
+    def _request(self, session, label: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.base_url}{path}", timeout=30, **kwargs)
+            ok = response.status_code < 400
+        except requests.exceptions.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        if self._recording:
+            with self._lock:
+                self._latencies[label].append(elapsed)
+                if not ok:
+                    self._errors[label] += 1
+        return response
+
+    # ----- scenarios -----
+    def scenario_bootstrap(self, session, rng):
+        for path in BOOTSTRAP_PATHS:
+            self._request(session, f"GET /api{path}", "GET", path)
+
+    def scenario_product_page(self, session, rng):
+        product_id = rng.choice(self.product_ids)
+        self._request(session, "GET /api/products/{id}", "GET", f"/products/{product_id}")
+
+    def scenario_newsletter(self, session, rng):
+        self._request(session, "POST /api/newsletter", "POST", "/newsletter",
+                      json={"email": f"loadtest-{rng.getrandbits(48):x}@example.com"})
+
+    def scenario_bulk_order(self, session, rng):
+        self._request(session, "POST /api/bulk-orders", "POST", "/bulk-orders", json={
+            "name": "Load Test", "company": "Loadtest Pvt Ltd", "email": "buyer@example.com",
+            "phone": "9999999999", "productType": "Dry Fruits", "quantity": f"{rng.randint(10, 500)} kg",
+            "message": "Synthetic bulk order from the load test",
+        })
+
+    def scenario_admin_dashboard(self, session, rng):
+        for path in ["/products", "/categories", "/testimonials", "/gift-boxes"]:
+            self._request(session, f"GET /api{path}", "GET", path)
+
+    def scenario_product_update(self, session, rng):
+        product_id = rng.choice(self.product_ids)
+        self._request(session, "PUT /api/products/{id}", "PUT", f"/products/{product_id}",
+                      json={"basePrice": rng.randint(80, 2500)})
+
+    def scenario_upload(self, session, rng):
+        response = self._request(session, "POST /api/upload", "POST", "/upload",
+                                 files={"file": ("loadtest.png", TINY_PNG, "image/png")})
+        if response is not None and response.ok:
+            with self._lock:
+                self.uploaded_files.append(response.json()["filename"])
+
+    def scenario_submissions(self, session, rng):
+        for path in ["/bulk-orders", "/newsletter"]:
+            self._request(session, f"GET /api{path}", "GET", path)
+
+    # ----- driver -----
+    def _worker(self, worker_id: int, deadline: float):
+        session = requests.Session()
+        rng = random.Random(self.rng_seed * 1000 + worker_id)
+        names, weights = zip(*self.mix.items())
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            getattr(self, f"scenario_{scenario}")(session, rng)
+
+    def run(self, duration: float, warmup: float) -> dict:
+        if warmup > 0:
+            self._drive(warmup)
+        self._recording = True
+        start = time.perf_counter()
+        self._drive(duration)
+        elapsed = time.perf_counter() - start
+        self._recording = False
+        return self.report(elapsed)
+
+    def _drive(self, seconds: float):
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=self._worker, args=(i, deadline)) for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        total = 0
+        for label, latencies in sorted(self._latencies.items()):
+            latencies = sorted(latencies)
+            total += len(latencies)
+            endpoints[label] = {
+                "requests": len(latencies),
+                "errors": self._errors[label],
+                "rps": round(len(latencies) / elapsed, 2),
+                "meanMs": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50Ms": round(percentile(latencies, 50) * 1000, 3),
+                "p90Ms": round(percentile(latencies, 90) * 1000, 3),
+                "p99Ms": round(percentile(latencies, 99) * 1000, 3),
+                "maxMs": round(latencies[-1] * 1000, 3),
+            }
+        return {
+            "durationSeconds": round(elapsed, 3),
+            "concurrency": self.concurrency,
+            "products": len(self.product_ids),
+            "totalRequests": total,
+            "totalErrors": sum(self._errors.values()),
+            "rps": round(total / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+    def cleanup_uploads(self):
+        for filename in self.uploaded_files:
+            (BACKEND_DIR / "uploads" / filename).unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the DryFruto backend")
+    parser.add_argument("--base-url", help="Use an already running API (e.g. http://localhost:8001) instead of starting one")
+    parser.add_argument("--mongo-url", help="Start server:app against this MongoDB (uses the dryfruto_loadtest database)")
+    parser.add_argument("--mongod", default=shutil.which("mongod"), help="mongod binary for a throwaway local database")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of a real MongoDB")
+    parser.add_argument("--products", type=int, default=1000, help="Synthetic products loaded before the server starts")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds of traffic")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds of traffic before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for catalog and traffic")
+    parser.add_argument("--no-seed", action="store_true", help="Do not replace the catalog (use existing data)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--serve-in-memory", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_in_memory:
+        serve_in_memory(args.serve_in_memory, args.products, args.seed)
+        return
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url.rstrip("/") + "/api"
+    else:
+        products = 0 if args.no_seed else args.products
+        if args.in_memory or not (args.mongo_url or args.mongod):
+            server = ServerProcess(in_memory=True, products=products, seed=args.seed)
+        elif args.mongo_url:
+            server = ServerProcess(mongo_url=args.mongo_url, products=products, seed=args.seed)
+        else:
+            server = ServerProcess(mongod=args.mongod, products=products, seed=args.seed)
+        server.start()
+        base_url = server.base_url
+
+    mongo_url = server.mongo_url if server and not server.in_memory else None
+    tester = LoadTester(base_url, args.mix, args.concurrency, args.seed, mongo_url)
+    try:
+        tester.load_product_ids()
+        result = tester.run(args.duration, args.warmup)
+        result["mix"] = args.mix
+        result["backend"] = "external" if args.base_url else ("in-memory" if server.in_memory else "mongodb")
+    finally:
+        if server:
+            tester.cleanup_uploads()
+            server.stop()
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, createContext, useContext } from 'react';
+import React, { useState, useEffect, useRef, createContext, useContext } from 'react';
 import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -77,10 +77,99 @@ export const DataProvider = ({ children }) => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetchAllData();
+    fetchAllData({ snapshot: true });
   }, []);
 
-  const fetchAllData = async () => {
+  // Live updates: refresh only the collection (or products) named by each change event
+  const collectionSetters = {
+    categories: [setCategories, 'categories'],
+    products: [setProducts, 'products'],
+    heroSlides: [setHeroSlides, 'hero-slides'],
+    testimonials: [setTestimonials, 'testimonials'],
+    giftBoxes: [setGiftBoxes, 'gift-boxes'],
+  };
+  const pendingRefresh = useRef({});
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    const source = new EventSource(`${API}/events`);
+    source.addEventListener('change', (event) => applyChange(JSON.parse(event.data)));
+    // After a reconnect (network loss, or dropped with 'overflow' for falling behind)
+    // changes may have been missed: catch up with one full refresh
+    let connected = false;
+    source.addEventListener('open', () => {
+      if (connected) fetchAllData();
+      connected = true;
+    });
+    return () => source.close();
+  }, []);
+
+  const applyChange = ({ collection, ids, deleted }) => {
+    if (collection === 'siteSettings') {
+      axios.get(`${API}/site-settings`, { params: { compact: true } }).then((res) => applySettings(res.data)).catch(() => {});
+      return;
+    }
+    const entry = collectionSetters[collection];
+    if (!entry) return;
+    const [setItems, path] = entry;
+    if (deleted) {
+      setItems((items) => items.filter((item) => !deleted.includes(item.id)));
+    } else if (collection === 'products' && ids && ids.length <= 100) {
+      axios.get(`${API}/products`, { params: { ids: ids.join(',') } }).then((res) => {
+        const fresh = new Map(res.data.map((p) => [p.id, p]));
+        setItems((items) => [
+          ...items.map((p) => fresh.get(p.id) || p),
+          ...res.data.filter((p) => !items.some((item) => item.id === p.id)),
+        ]);
+      }).catch(() => {});
+    } else if (!pendingRefresh.current[collection]) {
+      // Coalesce bursts (bulk edits) into one reload of the collection
+      pendingRefresh.current[collection] = setTimeout(() => {
+        delete pendingRefresh.current[collection];
+        axios.get(`${API}/${path}`).then((res) => setItems(res.data)).catch(() => {});
+      }, 250);
+    }
+  };
+
+  const applySettings = (settings) => {
+    if (settings && Object.keys(settings).length > 0) {
+      setSiteSettings((current) => ({ ...current, ...settings }));
+      if (settings.themeCssUrl) {
+        applyThemeStylesheet(settings.themeCssUrl);
+      }
+    }
+  };
+
+  // Content snapshots published by the backend are served by nginx straight from disk
+  const fetchSnapshot = async () => {
+    const manifest = await axios.get(`${BACKEND_URL}/content/latest.json`);
+    // bootstrap.json leaves the catalog to products.json of the same version; fetch both at once
+    const { files } = manifest.data;
+    const [res, products] = await Promise.all([
+      axios.get(`${BACKEND_URL}${files.bootstrap}`),
+      axios.get(`${BACKEND_URL}${files.products}`),
+    ]);
+    return { ...res.data, products: products.data };
+  };
+
+  // The first load may come from the snapshot; refreshes after edits go to the API,
+  // as a new snapshot is published a moment after the write
+  const fetchAllData = async ({ snapshot: useSnapshot = false } = {}) => {
+    if (useSnapshot) {
+      try {
+        const snapshot = await fetchSnapshot();
+        setCategories(snapshot.categories);
+        setProducts(snapshot.products);
+        setHeroSlides(snapshot.heroSlides);
+        setTestimonials(snapshot.testimonials);
+        setGiftBoxes(snapshot.giftBoxes);
+        applySettings(snapshot.siteSettings);
+        setLoading(false);
+        return;
+      } catch (error) {
+        // Not published (or unreachable): load from the API
+      }
+    }
     try {
       const [catRes, prodRes, heroRes, testRes, giftRes, settingsRes] = await Promise.all([
         axios.get(`${API}/categories`).catch(() => ({ data: [] })),
@@ -88,7 +177,7 @@ export const DataProvider = ({ children }) => {
         axios.get(`${API}/hero-slides`).catch(() => ({ data: [] })),
         axios.get(`${API}/testimonials`).catch(() => ({ data: [] })),
         axios.get(`${API}/gift-boxes`).catch(() => ({ data: [] })),
-        axios.get(`${API}/site-settings`).catch(() => ({ data: {} }))
+        axios.get(`${API}/site-settings`, { params: { compact: true } }).catch(() => ({ data: {} }))
       ]);
 
       setCategories(catRes.data);
@@ -96,17 +185,7 @@ export const DataProvider = ({ children }) => {
       setHeroSlides(heroRes.data);
       setTestimonials(testRes.data);
       setGiftBoxes(giftRes.data);
-      if (settingsRes.data && Object.keys(settingsRes.data).length > 0) {
-        setSiteSettings(settingsRes.data);
-        // Apply theme CSS variables
-        if (settingsRes.data.theme) {
-          applyThemeCSS(settingsRes.data.theme);
-        }
-        // Apply page-specific CSS styles
-        if (settingsRes.data.pageStyles) {
-          applyPageStyles(settingsRes.data.pageStyles);
-        }
-      }
+      applySettings(settingsRes.data);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
@@ -114,87 +193,18 @@ export const DataProvider = ({ children }) => {
     }
   };
 
-  // Apply page-specific CSS styles
-  const applyPageStyles = (pageStyles) => {
-    const root = document.documentElement;
-    
-    // Apply global styles
-    if (pageStyles.global) {
-      const global = pageStyles.global;
-      root.style.setProperty('--header-bg', global.headerBg);
-      root.style.setProperty('--header-text', global.headerText);
-      root.style.setProperty('--header-nav-hover', global.headerNavHover);
-      root.style.setProperty('--footer-bg', global.footerBg);
-      root.style.setProperty('--footer-text', global.footerText);
-      root.style.setProperty('--footer-link', global.footerLink);
-      root.style.setProperty('--color-primary', global.primaryColor);
-      root.style.setProperty('--color-accent', global.accentColor);
-      root.style.setProperty('--color-accentHover', global.accentHover);
-      root.style.setProperty('--color-text', global.textColor);
-      root.style.setProperty('--color-textLight', global.textLight);
-      root.style.setProperty('--color-background', global.backgroundColor);
-      root.style.setProperty('--card-bg', global.cardBg);
-      root.style.setProperty('--card-border', global.cardBorder);
-      root.style.setProperty('--btn-radius', global.buttonRadius);
-    }
-    
-    // Apply page-specific styles as CSS variables
-    Object.entries(pageStyles).forEach(([page, styles]) => {
-      if (page !== 'global' && styles) {
-        Object.entries(styles).forEach(([key, value]) => {
-          root.style.setProperty(`--${page}-${key}`, value);
-        });
-      }
-    });
-  };
-
-  // Apply theme CSS variables to document
-  const applyThemeCSS = (theme) => {
-    const root = document.documentElement;
-    
-    if (theme.colors) {
-      Object.entries(theme.colors).forEach(([key, value]) => {
-        root.style.setProperty(`--color-${key}`, value);
-      });
-    }
-    
-    if (theme.typography) {
-      root.style.setProperty('--font-family', theme.typography.fontFamily);
-      root.style.setProperty('--heading-font', theme.typography.headingFont);
-      root.style.setProperty('--base-font-size', theme.typography.baseFontSize);
-      root.style.setProperty('--h1-size', theme.typography.h1Size);
-      root.style.setProperty('--h2-size', theme.typography.h2Size);
-      root.style.setProperty('--h3-size', theme.typography.h3Size);
-    }
-    
-    if (theme.header) {
-      root.style.setProperty('--header-bg', theme.header.background);
-      root.style.setProperty('--header-text', theme.header.text);
-      root.style.setProperty('--header-nav-text', theme.header.navText);
-      root.style.setProperty('--header-nav-hover', theme.header.navHover);
-    }
-    
-    if (theme.footer) {
-      root.style.setProperty('--footer-bg', theme.footer.background);
-      root.style.setProperty('--footer-text', theme.footer.text);
-      root.style.setProperty('--footer-link', theme.footer.linkColor);
-    }
-    
-    if (theme.buttons) {
-      root.style.setProperty('--btn-primary-bg', theme.buttons.primaryBg);
-      root.style.setProperty('--btn-primary-text', theme.buttons.primaryText);
-      root.style.setProperty('--btn-primary-hover', theme.buttons.primaryHover);
-      root.style.setProperty('--btn-secondary-bg', theme.buttons.secondaryBg);
-      root.style.setProperty('--btn-secondary-text', theme.buttons.secondaryText);
-      root.style.setProperty('--btn-secondary-hover', theme.buttons.secondaryHover);
-      root.style.setProperty('--btn-radius', theme.buttons.borderRadius);
+  // Theme and page styles come precompiled by the backend as one content-hashed stylesheet
+  const applyThemeStylesheet = (url) => {
+    let link = document.getElementById('theme-stylesheet');
+    if (!link) {
+      link = document.createElement('link');
+      link.id = 'theme-stylesheet';
+      link.rel = 'stylesheet';
+      document.head.appendChild(link);
     }
-    
-    if (theme.cards) {
-      root.style.setProperty('--card-bg', theme.cards.background);
-      root.style.setProperty('--card-border', theme.cards.border);
-      root.style.setProperty('--card-shadow', theme.cards.shadow);
-      root.style.setProperty('--card-radius', theme.cards.borderRadius);
+    const href = `${BACKEND_URL}${url}`;
+    if (link.getAttribute('href') !== href) {
+      link.setAttribute('href', href);
     }
   };
 
@@ -206,7 +216,7 @@ export const DataProvider = ({ children }) => {
     giftBoxes,
     siteSettings,
     loading,
-    refreshData: fetchAllData
+    refreshData: () => fetchAllData()
   };
 
   return (
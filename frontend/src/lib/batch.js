@@ -0,0 +1,14 @@
+import axios from 'axios';
+
+// Several GETs in one round trip through POST /api/batch; resolves to the bodies in order
+export async function batchGet(api, paths) {
+  const res = await axios.post(`${api}/batch`, {
+    requests: paths.map((path) => ({ method: 'GET', path: `/api/${path}` })),
+  });
+  return res.data.responses.map((item) => {
+    if (item.status >= 400) {
+      throw new Error(`GET /api/${paths[item.index]} failed with ${item.status}`);
+    }
+    return item.body;
+  });
+}
@@ -21,6 +21,8 @@ const AboutUsManager = () => {
   });
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
+  // ETag of the about section: other settings sections can change without conflicting
+  const [etag, setEtag] = useState(null);
   
   // Form states for adding new items
   const [newStoryParagraph, setNewStoryParagraph] = useState('');
@@ -36,11 +38,12 @@ const AboutUsManager = () => {
 
   const fetchSettings = async () => {
     try {
-      const response = await axios.get(`${API}/site-settings`);
+      const response = await axios.get(`${API}/site-settings/about`);
       setSettings(prev => ({
         ...prev,
         ...response.data
       }));
+      setEtag(response.headers.etag);
     } catch (error) {
       console.error('Error fetching settings:', error);
     } finally {
@@ -51,10 +54,19 @@ const AboutUsManager = () => {
   const handleSave = async () => {
     try {
       setSaving(true);
-      await axios.put(`${API}/site-settings`, settings);
+      const response = await axios.patch(`${API}/site-settings/about`, settings, {
+        headers: { 'Content-Type': 'application/merge-patch+json', ...(etag && { 'If-Match': etag }) }
+      });
+      setSettings(response.data);
+      setEtag(response.headers.etag);
       alert('About Us settings saved successfully!');
     } catch (error) {
       console.error('Error saving settings:', error);
+      if (error.response?.status === 412) {
+        alert('About Us settings were changed by someone else. Reloading the latest version.');
+        await fetchSettings();
+        return;
+      }
       alert('Error saving settings');
     } finally {
       setSaving(false);
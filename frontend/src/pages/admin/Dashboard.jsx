@@ -21,18 +21,14 @@ const Dashboard = () => {
 
   const fetchStats = async () => {
     try {
-      const [products, categories, testimonials, giftBoxes] = await Promise.all([
-        axios.get(`${API}/products`),
-        axios.get(`${API}/categories`),
-        axios.get(`${API}/testimonials`),
-        axios.get(`${API}/gift-boxes`)
-      ]);
+      const response = await axios.get(`${API}/admin/stats`);
+      const { counts } = response.data;
 
       setStats({
-        products: products.data.length,
-        categories: categories.data.length,
-        testimonials: testimonials.data.length,
-        giftBoxes: giftBoxes.data.length
+        products: counts.products,
+        categories: counts.categories,
+        testimonials: counts.testimonials,
+        giftBoxes: counts.giftBoxes
       });
     } catch (error) {
       console.error('Error fetching stats:', error);
@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Plus, Edit2, Trash2, Save, X, Upload, Image as ImageIcon, Loader2 } from 'lucide-react';
 import axios from 'axios';
+import { batchGet } from '../../lib/batch';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -134,16 +135,11 @@ const FrontendManager = () => {
 
   const fetchData = async () => {
     try {
-      const [heroRes, catRes, testRes, giftRes] = await Promise.all([
-        axios.get(`${API}/hero-slides`),
-        axios.get(`${API}/categories`),
-        axios.get(`${API}/testimonials`),
-        axios.get(`${API}/gift-boxes`)
-      ]);
-      setHeroSlides(heroRes.data);
-      setCategories(catRes.data);
-      setTestimonials(testRes.data);
-      setGiftBoxes(giftRes.data);
+      const [slides, cats, tests, gifts] = await batchGet(API, ['hero-slides', 'categories', 'testimonials', 'gift-boxes']);
+      setHeroSlides(slides);
+      setCategories(cats);
+      setTestimonials(tests);
+      setGiftBoxes(gifts);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
@@ -161,7 +157,9 @@ const FrontendManager = () => {
       }[activeTab];
 
       if (editItem?.id) {
-        await axios.put(`${API}/${endpoint}/${editItem.id}`, data);
+        await axios.put(`${API}/${endpoint}/${editItem.id}`, data, {
+          headers: { 'If-Match': `"${editItem.version ?? 0}"` }
+        });
       } else {
         await axios.post(`${API}/${endpoint}`, data);
       }
@@ -170,6 +168,11 @@ const FrontendManager = () => {
       setEditItem(null);
     } catch (error) {
       console.error('Error saving:', error);
+      if (error.response?.status === 412) {
+        alert('This item was changed by someone else. Reloading the latest version.');
+        await fetchData();
+        return;
+      }
       alert('Error saving data');
     }
   };
@@ -36,7 +36,10 @@ const ProductsManager = () => {
   const handleSave = async (data) => {
     try {
       if (editItem?.id) {
-        await axios.put(`${API}/products/${editItem.id}`, data);
+        // If-Match rejects the save (412) if someone else changed the product meanwhile
+        await axios.put(`${API}/products/${editItem.id}`, data, {
+          headers: { 'If-Match': `"${editItem.version ?? 0}"` }
+        });
       } else {
         await axios.post(`${API}/products`, data);
       }
@@ -45,6 +48,11 @@ const ProductsManager = () => {
       setEditItem(null);
     } catch (error) {
       console.error('Error saving:', error);
+      if (error.response?.status === 412) {
+        alert('This product was changed by someone else. Reloading the latest version.');
+        await fetchData();
+        return;
+      }
       alert('Error saving product');
     }
   };
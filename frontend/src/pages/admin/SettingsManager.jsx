@@ -53,10 +53,18 @@ const SettingsManager = () => {
   const handleSave = async () => {
     try {
       setSaving(true);
-      await axios.put(`${API}/site-settings`, settings);
+      const response = await axios.put(`${API}/site-settings`, settings, {
+        headers: { 'If-Match': `"${settings.version ?? 0}"` }
+      });
+      setSettings(response.data);
       alert('Settings saved successfully!');
     } catch (error) {
       console.error('Error saving settings:', error);
+      if (error.response?.status === 412) {
+        alert('Settings were changed by someone else. Reloading the latest version.');
+        await fetchSettings();
+        return;
+      }
       alert('Error saving settings');
     } finally {
       setSaving(false);
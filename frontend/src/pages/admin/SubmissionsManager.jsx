@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Package, Mail, Download, Trash2, Eye, Search, Filter, RefreshCw } from 'lucide-react';
 import axios from 'axios';
+import { batchGet } from '../../lib/batch';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -20,12 +21,9 @@ const SubmissionsManager = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [bulkRes, newsRes] = await Promise.all([
-        axios.get(`${API}/bulk-orders`),
-        axios.get(`${API}/newsletter`)
-      ]);
-      setBulkOrders(bulkRes.data);
-      setNewsletters(newsRes.data);
+      const [orders, subscriptions] = await batchGet(API, ['bulk-orders', 'newsletter']);
+      setBulkOrders(orders);
+      setNewsletters(subscriptions);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
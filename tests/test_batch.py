@@ -0,0 +1,39 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from server import BatchItem
+
+pytestmark = pytest.mark.anyio
+
+
+async def echo_headers(scope, receive, send):
+    body = json.dumps([[k.decode(), v.decode()] for k, v in scope["headers"]]).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def test_batch_runs_each_request(api):
+    response = await api.post("/batch", json={"requests": [
+        {"path": "/api/site-settings/contact"},
+        {"method": "PATCH", "path": "/api/site-settings/contact", "body": {"phone": "1"}},
+        {"path": "/api/batch"},
+    ]})
+
+    results = response.json()["responses"]
+    assert [r["status"] for r in results] == [200, 200, 400]
+    assert results[1]["body"]["phone"] == "1"
+
+
+async def test_item_headers_replace_defaults_case_insensitively(monkeypatch):
+    monkeypatch.setattr(server, "app", echo_headers)
+    parent = SimpleNamespace(scope={"type": "http", "headers": [(b"accept-language", b"en"), (b"cookie", b"x")]})
+    item = BatchItem(method="POST", path="/api/echo", body={"a": 1},
+                     headers={"Content-Type": "application/merge-patch+json", "Accept-Language": "hi"})
+
+    result = await server.dispatch_subrequest(parent, item)
+
+    assert sorted(map(tuple, result["body"])) == [
+        ("accept-language", "hi"), ("content-length", "8"), ("content-type", "application/merge-patch+json")]
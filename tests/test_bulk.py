@@ -0,0 +1,68 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def review_data(name):
+    return {"name": name, "review": "Fresh and crunchy", "avatar": ""}
+
+
+async def bulk(api, *operations):
+    response = await api.post("/testimonials/bulk", json={"operations": list(operations)})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_bulk_reports_a_result_per_operation(api):
+    created = await bulk(api, {"op": "insert", "data": review_data("Asha")},
+                         {"op": "insert", "data": review_data("Ravi")},
+                         {"op": "insert", "data": review_data("Meera")})
+    first, second, third = (r["id"] for r in created["results"])
+
+    result = await bulk(
+        api,
+        {"op": "update", "id": first, "version": 0, "data": {"review": "Good"}},
+        {"op": "update", "id": second, "version": 3, "data": {"review": "Good"}},
+        {"op": "delete", "id": third},
+        {"op": "delete", "id": "missing"},
+        {"op": "insert", "data": {"name": "No review"}},
+        {"op": "upsert", "id": first},
+    )
+
+    assert [(r["index"], r["status"]) for r in result["results"]] == [
+        (0, "updated"), (1, "conflict"), (2, "deleted"), (3, "not_found"), (4, "invalid"), (5, "invalid"),
+    ]
+    assert result["results"][1]["detail"] == "Current version is 0"
+    assert result["summary"] == {"updated": 1, "conflict": 1, "deleted": 1, "not_found": 1, "invalid": 2}
+    stored = (await api.get("/testimonials")).json()
+    assert sorted((t["id"], t["review"], t["version"]) for t in stored) == sorted(
+        [(first, "Good", 1), (second, "Fresh and crunchy", 0)])
+
+
+async def test_bulk_insert_results_carry_generated_ids(api):
+    result = await bulk(api, {"op": "insert", "data": review_data("Asha")})
+
+    [inserted] = result["results"]
+    assert inserted["status"] == "inserted"
+    assert [t["id"] for t in (await api.get("/testimonials")).json()] == [inserted["id"]]
+
+
+async def test_bulk_rejects_unknown_collection(api):
+    response = await api.post("/orders/bulk", json={"operations": []})
+
+    assert response.status_code == 404
+
+
+async def test_bulk_rejects_repeated_targets(api):
+    created = await bulk(api, {"op": "insert", "data": review_data("Asha")})
+    doc_id = created["results"][0]["id"]
+
+    response = await api.post("/testimonials/bulk", json={"operations": [
+        {"op": "update", "id": doc_id, "version": 0, "data": {"review": "Good"}},
+        {"op": "update", "id": doc_id, "version": 0, "data": {"review": "Bad"}},
+    ]})
+
+    assert response.status_code == 400
+    assert doc_id in response.json()["detail"]
+    stored = (await api.get("/testimonials")).json()
+    assert [(t["review"], t["version"]) for t in stored] == [("Fresh and crunchy", 0)]
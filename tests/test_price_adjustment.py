@@ -0,0 +1,39 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def product(id, base_price, **variants):
+    return {"id": id, "name": id.title(), "slug": id, "category": "nuts", "type": "almond",
+            "basePrice": base_price, "priceVariants": variants, "image": ""}
+
+
+async def test_nearest_rounds_halves_up(api, db):
+    await db.products.insert_many([product("almonds", 250, **{"500g": 450}), product("cashews", 149.99)])
+
+    response = await api.post("/products/price-adjustment",
+                              json={"mode": "absolute", "value": 0, "all": True, "roundTo": 100})
+
+    assert response.status_code == 200
+    prices = {p["id"]: (p["basePrice"], p["priceVariants"]) async for p in db.products.find()}
+    assert prices == {"almonds": (300, {"500g": 500}), "cashews": (100, {})}
+
+
+async def test_prices_keep_two_decimals_rounding_halves_up(api, db):
+    await db.products.insert_one(product("almonds", 10.125))
+
+    response = await api.post("/products/price-adjustment",
+                              json={"mode": "percent", "value": 0, "all": True, "dryRun": True})
+
+    assert response.json()["changes"][0]["newBasePrice"] == 10.13
+
+
+async def test_unknown_mode_and_rounding_are_rejected(api, db):
+    await db.products.insert_one(product("almonds", 250))
+
+    mode = await api.post("/products/price-adjustment", json={"mode": "double", "value": 2, "all": True})
+    rounding = await api.post("/products/price-adjustment",
+                              json={"value": 2, "all": True, "roundTo": 10, "rounding": "bankers"})
+
+    assert (mode.status_code, rounding.status_code) == (422, 422)
+    assert (await db.products.find_one({"id": "almonds"}))["basePrice"] == 250
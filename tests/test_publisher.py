@@ -0,0 +1,28 @@
+import gzip
+import json
+
+import pytest
+
+import server
+from publisher import SnapshotPublisher
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_published_bootstrap_references_the_products_file(db, tmp_path):
+    await db.products.insert_one({
+        "id": "almonds", "name": "Almonds", "slug": "almonds", "category": "nuts", "type": "almond",
+        "basePrice": 100, "image": "", "sku": "ALM", "shortDescription": "", "description": "",
+    })
+    publisher = SnapshotPublisher(tmp_path, server.render_snapshots)
+
+    manifest = await publisher.publish()
+
+    version = tmp_path / f"v{manifest['revision']}"
+    bootstrap = json.loads((version / "bootstrap.json").read_text())
+    products = json.loads(gzip.decompress((version / "products.json.gz").read_bytes()))
+    assert "products" not in bootstrap
+    assert bootstrap["productsFile"] == "products.json"
+    assert manifest["files"]["products"].endswith(f"/v{manifest['revision']}/products.json")
+    assert [p["id"] for p in products] == ["almonds"]
+    assert set(bootstrap) >= {"categories", "heroSlides", "testimonials", "giftBoxes", "siteSettings"}
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from query_profiler import QueryProfiler
+
+
+def started(profiler, request_id, command_name, command):
+    profiler.started(SimpleNamespace(command_name=command_name, command={command_name: "products", **command},
+                                     database_name="dryfruto", connection_id=("db", 27017), request_id=request_id))
+
+
+def samples(profiler):
+    return {stats.shape["op"]: stats.sample_command for stats in profiler._stats.values()}
+
+
+def test_only_explainable_shapes_keep_a_sample_without_payloads():
+    profiler = QueryProfiler()
+
+    started(profiler, 1, "insert", {"documents": [{"id": "a", "description": "x" * 1000}]})
+    started(profiler, 2, "update", {"updates": [{"q": {"id": "a"}, "u": {"$set": {"description": "y"}}}],
+                                    "lsid": {"id": "session"}})
+    started(profiler, 3, "findAndModify", {"query": {"id": "a", "version": 1}, "update": {"$inc": {"version": 1}},
+                                           "fields": {"_id": 0}})
+    started(profiler, 4, "find", {"filter": {"category": "nuts"}, "sort": {"name": 1}, "$db": "dryfruto"})
+
+    assert samples(profiler) == {
+        "insert": None,
+        "update": {"find": "products", "filter": {"id": "a"}},
+        "findAndModify": {"find": "products", "filter": {"id": "a", "version": 1}, "limit": 1},
+        "find": {"find": "products", "filter": {"category": "nuts"}, "sort": {"name": 1}},
+    }
+    assert len(profiler._pending) == 3
@@ -0,0 +1,66 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+TIERS = [
+    {"minKg": 1, "discountPercent": 5, "label": "1kg+"},
+    {"minKg": 3, "discountPercent": 10, "label": "3kg+"},
+    {"minKg": 10, "discountPercent": 15, "label": "10kg+"},
+]
+
+
+@pytest.fixture
+async def almonds(db):
+    await db.products.insert_one({
+        "id": "almonds", "name": "Almonds", "slug": "almonds", "category": "nuts", "type": "almond",
+        "basePrice": 100, "image": "", "sku": "ALM", "shortDescription": "", "description": "",
+        "priceVariants": {"1kg": 800},
+    })
+
+
+async def test_quote_applies_the_highest_tier_reached_by_weight(api, almonds):
+    response = await api.put("/site-settings", json={"bulkPricingTiers": TIERS})
+    assert response.status_code == 200
+
+    response = await api.post("/quote", json={"lines": [
+        {"productId": "almonds", "variant": "1kg", "quantity": 3},
+        {"productId": "almonds", "variant": "250g", "quantity": 2},
+        {"productId": "almonds", "variant": "3kg", "quantity": 1},
+        {"productId": "cashews", "quantity": 1},
+    ]})
+
+    assert response.status_code == 200
+    quote = response.json()
+    assert [(line["unitPrice"], line["lineTotal"], line["weightKg"]) for line in quote["lines"][:2]] == [
+        (800, 2400, 3), (240, 480, 0.5),
+    ]
+    assert [line.get("error") for line in quote["lines"][2:]] == ["Variant '3kg' not available", "Product not found"]
+    assert quote["totalWeightKg"] == 3.5
+    assert quote["tier"] == TIERS[1]
+    assert (quote["subtotal"], quote["discount"], quote["total"]) == (2880, 288, 2592)
+
+
+async def test_quote_below_every_tier_has_no_discount(api, almonds):
+    await api.put("/site-settings", json={"bulkPricingTiers": TIERS})
+
+    quote = (await api.post("/quote", json={"lines": [{"productId": "almonds", "quantity": 2}]})).json()
+
+    assert quote["tier"] is None
+    assert (quote["subtotal"], quote["discount"], quote["total"]) == (200, 0, 200)
+
+
+async def test_quote_skips_invalid_stored_tiers(api, db, almonds):
+    await db.site_settings.insert_one({"id": "site_settings", "bulkPricingTiers": [
+        {"minKg": "lots", "discountPercent": 50}, {"minKg": 1, "discountPercent": 5},
+    ]})
+
+    quote = (await api.post("/quote", json={"lines": [{"productId": "almonds", "variant": "1kg", "quantity": 1}]})).json()
+
+    assert quote["tier"] == {"minKg": 1, "discountPercent": 5, "label": ""}
+    assert quote["total"] == 760
+
+
+async def test_quote_rejects_zero_quantity(api, almonds):
+    response = await api.post("/quote", json={"lines": [{"productId": "almonds", "quantity": 0}]})
+
+    assert response.status_code == 400
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+import pytest
+
+import catalog_generator
+import search_index
+import server
+from search_index import SearchIndex
+
+CATEGORY_NAMES = {"nuts": "Nuts", "dried-fruits": "Dried Fruits"}
+PRODUCTS = [
+    {"id": "cashews", "name": "Roasted Cashews", "category": "nuts", "shortDescription": "Crunchy cashew halves",
+     "description": "Whole cashews, slow roasted", "benefits": ["Rich in iron"]},
+    {"id": "almonds", "name": "Salted Almonds", "category": "nuts", "shortDescription": "Crunchy and salty",
+     "description": "Almonds roasted with a little cashew oil", "benefits": []},
+    {"id": "dates", "name": "Medjool Dates", "category": "dried-fruits", "shortDescription": "Soft and sweet",
+     "description": "Naturally sweet dates", "benefits": ["Rich in fibre"]},
+]
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex.built(PRODUCTS, CATEGORY_NAMES)
+
+
+def test_search_ranks_name_matches_above_description_matches(index):
+    result = index.search("cashew")
+
+    assert result["total"] == 2
+    assert ids(result["results"]) == ["cashews", "almonds"]
+    assert result["results"][0]["score"] > result["results"][1]["score"]
+
+
+def test_search_requires_every_term_and_stems_them(index):
+    assert ids(index.search("roasted nuts")["results"]) == ["cashews", "almonds"]
+    assert index.search("Cashews")["total"] == index.search("cashew")["total"]
+    assert index.search("cashew dates") == {"query": "cashew dates", "total": 0, "results": []}
+
+
+def test_search_matches_category_names(index):
+    assert ids(index.search("dried fruits")["results"]) == ["dates"]
+
+
+def test_search_pages_with_offset(index):
+    page = index.search("cashew", limit=1, offset=1)
+
+    assert page["total"] == 2
+    assert ids(page["results"]) == ["almonds"]
+
+
+def test_suggest_completes_the_last_word(index):
+    result = index.suggest("roasted ca")
+
+    assert result["completions"] == ["cashew", "cashews"]
+    assert ids(result["products"]) == ["cashews", "almonds"]
+
+
+def test_suggest_after_a_space_searches_whole_words(index):
+    result = index.suggest("sweet ")
+
+    assert result["completions"] == []
+    assert ids(result["products"]) == ["dates"]
+
+
+def test_product_changes_update_the_index(index):
+    index.product_changed("dates", {**PRODUCTS[2], "name": "Medjool Cashew Dates"})
+    index.product_changed("almonds", None)
+
+    assert ids(index.search("cashew")["results"]) == ["cashews", "dates"]
+    assert index.suggest("alm")["completions"] == []
+
+
+def test_dense_tier_ranking_matches_direct_scoring(monkeypatch):
+    categories = catalog_generator.generate_categories()
+    products = list(catalog_generator.generate_products(600, categories))
+    names = {c["slug"]: c["name"] for c in categories}
+    scanned = SearchIndex.built(products, names)
+    monkeypatch.setattr(search_index, "DENSE_POSTINGS", 8)
+    monkeypatch.setattr(search_index, "SCAN_POSTINGS", 0)
+    tiered = SearchIndex.built(products, names)
+
+    for query in ["almonds", "premium roasted", "organic cashew nuts", "kashmiri walnut", "dates"]:
+        expected, actual = scanned.search(query, limit=15), tiered.search(query, limit=15)
+        assert actual["total"] == expected["total"], query
+        assert [r["score"] for r in actual["results"]] == [r["score"] for r in expected["results"]], query
+
+
+@pytest.mark.anyio
+async def test_search_routes_serve_the_catalog(api, db):
+    await db.products.insert_many([{**p, "slug": p["id"], "type": "", "basePrice": 100, "image": ""}
+                                   for p in PRODUCTS])
+    await db.categories.insert_many([{"slug": slug, "name": name} for slug, name in CATEGORY_NAMES.items()])
+    await server.catalog_cache.products()
+    await asyncio.gather(*server.index_rebuilds)
+
+    search = (await api.get("/search", params={"q": "cashew", "limit": 1})).json()
+    suggest = (await api.get("/search/suggest", params={"q": "swe"})).json()
+
+    assert (search["total"], ids(search["results"])) == (2, ["cashews"])
+    assert suggest["completions"] == ["sweet"]
+    assert ids(suggest["products"]) == ["dates"]
+    assert (await api.get("/search", params={"q": "cashew", "limit": 0})).status_code == 400
+
+
+@pytest.mark.anyio
+async def test_catalog_load_does_not_wait_for_the_search_index(db, monkeypatch):
+    await db.products.insert_many([{**p, "slug": p["id"]} for p in PRODUCTS[:2]])
+    released = threading.Event()
+    built = SearchIndex.built
+
+    def blocked_built(*args):
+        released.wait(5)
+        return built(*args)
+
+    monkeypatch.setattr(SearchIndex, "built", blocked_built)
+    try:
+        products = await asyncio.wait_for(server.catalog_cache.products(), 1)
+        assert sorted(products) == ["almonds", "cashews"]
+        assert server.search_index._builds == 1  # still building
+        # Written while the index builds: replayed on the rebuilt index
+        server.search_index.product_changed("dates", {**PRODUCTS[2], "slug": "dates"})
+    finally:
+        released.set()
+    await asyncio.gather(*server.index_rebuilds)
+
+    assert sorted(ids(server.search_index.search("crunchy")["results"])) == ["almonds", "cashews"]
+    assert ids(server.search_index.search("dates")["results"]) == ["dates"]
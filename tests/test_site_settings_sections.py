@@ -0,0 +1,85 @@
+import pytest
+
+from server import SiteSettings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_patch_changes_only_the_given_members(api, db):
+    response = await api.patch("/site-settings/theme", json={"colors": {"accent": "#000000"}})
+
+    assert response.status_code == 200
+    colors = response.json()["colors"]
+    assert colors["accent"] == "#000000"
+    assert colors["primary"] == SiteSettings().theme["colors"]["primary"]
+    assert (await api.get("/site-settings/theme")).json() == response.json()
+
+    await api.patch("/site-settings/theme", json={"colors": {"primary": "#111111"}})
+    stored = await db.site_settings.find_one({"id": "site_settings"})
+    assert (stored["theme"]["colors"]["accent"], stored["theme"]["colors"]["primary"]) == ("#000000", "#111111")
+
+
+async def test_null_resets_a_field_to_its_default(api):
+    await api.patch("/site-settings/contact", json={"phone": "+91 90000 00000", "slogan": "Fresh every day"})
+
+    response = await api.patch("/site-settings/contact", json={"phone": None})
+
+    assert response.status_code == 200
+    assert response.json()["phone"] == SiteSettings().phone
+    assert response.json()["slogan"] == "Fresh every day"
+
+
+async def test_null_removes_a_nested_member(api):
+    await api.patch("/site-settings/page-styles", json={"home": {"heroOverlay": "#000", "ctaBg": "#fff"}})
+
+    response = await api.patch("/site-settings/page-styles", json={"home": {"heroOverlay": None}})
+
+    assert response.json()["home"] == {"ctaBg": "#fff"}
+
+
+async def test_unknown_fields_and_non_objects_are_rejected(api):
+    unknown = await api.patch("/site-settings/contact", json={"phone": "1", "theme": {}})
+    not_object = await api.patch("/site-settings/contact", json=["phone"])
+    invalid = await api.patch("/site-settings/bulk-order", json={"bulkPricingTiers": [{"minKg": -1}]})
+    section = await api.patch("/site-settings/nope", json={})
+
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "Not in the contact section: theme"
+    assert not_object.status_code == 400
+    assert invalid.status_code == 422
+    assert section.status_code == 404
+    assert (await api.get("/site-settings/contact")).json()["phone"] == SiteSettings().phone
+
+
+async def test_if_match_takes_the_section_etag(api):
+    etag = (await api.get("/site-settings/contact")).headers["etag"]
+
+    ok = await api.patch("/site-settings/contact", json={"phone": "1"}, headers={"If-Match": etag})
+    stale = await api.patch("/site-settings/contact", json={"phone": "2"}, headers={"If-Match": etag})
+
+    assert ok.status_code == 200
+    assert ok.headers["etag"] != etag
+    assert stale.status_code == 412
+    assert (await api.get("/site-settings/contact")).json()["phone"] == "1"
+
+
+async def test_writes_to_other_sections_keep_the_etag(api):
+    etag = (await api.get("/site-settings/contact")).headers["etag"]
+    await api.patch("/site-settings/theme", json={"colors": {"accent": "#000000"}})
+
+    cached = await api.get("/site-settings/contact", headers={"If-None-Match": etag})
+    response = await api.patch("/site-settings/contact", json={"phone": "1"}, headers={"If-Match": etag})
+
+    assert cached.status_code == 304
+    assert response.status_code == 200
+
+
+async def test_weak_validators_only_satisfy_if_none_match(api):
+    etag = (await api.get("/site-settings/contact")).headers["etag"]
+
+    cached = await api.get("/site-settings/contact", headers={"If-None-Match": f"W/{etag}"})
+    response = await api.patch("/site-settings/contact", json={"phone": "1"}, headers={"If-Match": f"W/{etag}"})
+
+    assert cached.status_code == 304
+    assert response.status_code == 412
+    assert (await api.get("/site-settings/contact")).json()["phone"] == SiteSettings().phone
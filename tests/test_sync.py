@@ -0,0 +1,91 @@
+import pytest
+
+import catalog_generator
+from revisions import RevisionLog
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_slide(api, title):
+    response = await api.post("/hero-slides", json={"title": title, "subtitle": "", "description": "",
+                                                    "image": f"/{title}.jpg", "cta": "Shop now"})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def sync(api, since):
+    response = await api.get("/sync", params={"since": since})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_sync_from_zero_is_a_full_snapshot(api):
+    slide = await create_slide(api, "Diwali")
+
+    result = await sync(api, 0)
+
+    assert result["full"] is True
+    assert result["revision"] == slide["revision"]
+    assert [s["id"] for s in result["changes"]["heroSlides"]] == [slide["id"]]
+    assert result["deleted"] == {}
+
+
+async def test_sync_returns_changes_and_tombstones_after_the_cursor(api):
+    kept = await create_slide(api, "Diwali")
+    removed = await create_slide(api, "Holi")
+    cursor = (await sync(api, 0))["revision"]
+
+    await api.put(f"/hero-slides/{kept['id']}", json={"title": "Diwali Gifting"})
+    await api.delete(f"/hero-slides/{removed['id']}")
+    added = await create_slide(api, "Eid")
+    result = await sync(api, cursor)
+
+    assert result["full"] is False
+    assert result["revision"] > cursor
+    assert sorted((s["id"], s["title"]) for s in result["changes"]["heroSlides"]) == sorted(
+        [(kept["id"], "Diwali Gifting"), (added["id"], "Eid")])
+    assert result["deleted"] == {"heroSlides": [removed["id"]]}
+
+
+async def test_sync_at_the_current_revision_is_empty(api):
+    await create_slide(api, "Diwali")
+    cursor = (await sync(api, 0))["revision"]
+
+    result = await sync(api, cursor)
+
+    assert result == {"revision": cursor, "full": False, "changes": {}, "deleted": {}}
+
+
+async def test_sync_from_a_cursor_ahead_of_the_server_is_full(api):
+    await create_slide(api, "Diwali")
+    cursor = (await sync(api, 0))["revision"]
+
+    result = await sync(api, cursor + 1000)
+
+    assert result["full"] is True
+    assert len(result["changes"]["heroSlides"]) == 1
+
+
+async def test_processes_sharing_the_database_draw_from_one_sequence(db):
+    first, second = RevisionLog(lambda: db), RevisionLog(lambda: db)
+
+    revisions = []
+    for log in (first, second, first, second):
+        async with log.allocate() as revision:
+            revisions.append(revision)
+
+    assert revisions == [1, 2, 3, 4]
+    assert await first.stable_revision() == await second.stable_revision() == 4
+
+
+async def test_catalog_generator_drop_leaves_tombstones(api, db):
+    await catalog_generator.load_catalog(db, products=6)
+    before = {p["id"] for p in (await sync(api, 0))["changes"]["products"]}
+    cursor = (await sync(api, 0))["revision"]
+
+    await catalog_generator.load_catalog(db, products=2, drop=True)
+    result = await sync(api, cursor)
+
+    assert set(result["deleted"]["products"]) == before
+    assert {p["id"] for p in result["changes"]["products"]} < before
+    assert len(result["changes"]["products"]) == 2
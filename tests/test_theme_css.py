@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+import theme_css
+from server import SiteSettings
+
+GOLDEN = Path(__file__).parent / "golden"
+
+
+def test_default_theme_compiles_to_the_golden_stylesheet():
+    defaults = SiteSettings()
+
+    css = theme_css.compile_css(defaults.theme, defaults.pageStyles)
+
+    assert css == (GOLDEN / "theme.css").read_text().rstrip("\n")
+
+
+def test_page_styles_override_theme_variables_in_order():
+    theme = {"colors": {"primary": "#111111", "accent": "#222222"}, "buttons": {"borderRadius": "4px"}}
+    page_styles = {"home": {"heroOverlay": "rgba(0,0,0,0.4)"},
+                   "global": {"primaryColor": "#333333", "buttonRadius": 8}}
+
+    css = theme_css.compile_css(theme, page_styles)
+
+    assert css == ":root{--color-accent:#222222;--color-primary:#333333;--btn-radius:8;" \
+                  "--home-heroOverlay:rgba(0,0,0,0.4)}"
+
+
+def test_unsafe_and_malformed_values_are_dropped():
+    theme = {"colors": {"primary": "red;}body{display:none", "accent": "#f59e0b", "bad name": "#000",
+                        "flag": True, "nested": {"a": 1}},
+             "header": "not an object", "cards": {"shadow": "0 0 1px /* x */ red"}}
+
+    css = theme_css.compile_css(theme, ["not", "an", "object"])
+
+    assert css == ":root{--color-accent:#f59e0b}"
+
+
+@pytest.mark.anyio
+async def test_theme_stylesheet_route_serves_content_hashed_css(api):
+    url = (await api.get("/site-settings")).json()["themeCssUrl"]
+
+    response = await api.get(url.removeprefix("/api"))
+
+    assert response.status_code == 200
+    assert response.text == (GOLDEN / "theme.css").read_text().rstrip("\n")
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert url == f"/api/theme/{theme_css.content_hash(response.text)}.css"
+
+    await api.patch("/site-settings/theme", json={"colors": {"accent": "#000000"}})
+    changed = (await api.get("/site-settings")).json()["themeCssUrl"]
+    assert changed != url
+    assert "--color-accent:#000000" in (await api.get(changed.removeprefix("/api"))).text
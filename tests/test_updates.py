@@ -0,0 +1,59 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_category(api, name="Almonds"):
+    response = await api.post("/categories", json={"name": name, "slug": name.lower(), "image": "", "icon": ""})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_update_returns_bumped_version_as_etag(api):
+    category = await create_category(api)
+
+    response = await api.put(f"/categories/{category['id']}", json={"name": "Premium Almonds"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"1"'
+    assert response.json()["name"] == "Premium Almonds"
+    assert response.json()["version"] == 1
+
+
+async def test_update_with_current_if_match_succeeds(api):
+    category = await create_category(api)
+    await api.put(f"/categories/{category['id']}", json={"name": "Premium Almonds"})
+
+    response = await api.put(f"/categories/{category['id']}", json={"name": "Royal Almonds"},
+                             headers={"If-Match": '"1"'})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"2"'
+    assert response.json()["name"] == "Royal Almonds"
+
+
+async def test_update_with_stale_if_match_is_rejected(api):
+    category = await create_category(api)
+    await api.put(f"/categories/{category['id']}", json={"name": "Premium Almonds"})
+
+    response = await api.put(f"/categories/{category['id']}", json={"name": "Royal Almonds"},
+                             headers={"If-Match": '"0"'})
+
+    assert response.status_code == 412
+    stored = (await api.get("/categories")).json()
+    assert [c["name"] for c in stored] == ["Premium Almonds"]
+
+
+async def test_update_with_malformed_if_match_is_rejected(api):
+    category = await create_category(api)
+
+    response = await api.put(f"/categories/{category['id']}", json={"name": "Royal Almonds"},
+                             headers={"If-Match": "latest"})
+
+    assert response.status_code == 400
+
+
+async def test_update_of_missing_document_is_not_found(api):
+    response = await api.put("/categories/missing", json={"name": "Royal Almonds"}, headers={"If-Match": '"0"'})
+
+    assert response.status_code == 404